@@ -0,0 +1,208 @@
+"""界面刷新路径的基准测试（无界面运行）
+
+用法：
+    python benchmark.py                          # 1k/10k/100k 三档，结果输出到标准输出
+    python benchmark.py --sizes 1000,10000 --repeat 50 --output bench.json
+
+每档数据量在临时目录中按固定随机种子生成任务（优先级、截止日期、完成状态混合），
+启动真实的 TodoWidget，逐项重复执行刷新、字体切换、排序、翻页、编辑等操作，
+以 JSON 输出每项耗时的百分位数（毫秒）。截止日期相对运行当天生成，
+同一种子在不同提交上得到相同分布的数据，结果可直接对比。
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+from datetime import date, timedelta
+
+os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+if script_dir not in sys.path:
+    sys.path.insert(0, script_dir)
+
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QT_VERSION_STR, PYQT_VERSION_STR
+
+from core.config import DATA_FILE, PRIORITY_VALUES
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+WINDOW_SIZES = ((300, 400), (500, 600), (800, 700))  # 覆盖 small/medium/large 三个字体档位
+SEARCH_QUERIES = ('任务 12', '描述', '日常使用', '任务 99 的')  # 从少量到大量匹配
+
+
+def generate_tasks(count, seed):
+    """生成 count 条任务：约 30% 已完成，截止日期分布在前 60 天到后 120 天"""
+    rng = random.Random(seed)
+    priorities = list(PRIORITY_VALUES)
+    today = date.today()
+    tasks = []
+    for i in range(count):
+        tasks.append({
+            'id': str(uuid.UUID(int=rng.getrandbits(128))),
+            'text': f'任务 {i} 的描述文本，长度与日常使用相近',
+            'priority': rng.choice(priorities),
+            'deadline': (today + timedelta(days=rng.randint(-60, 120))).isoformat(),
+            'completed': rng.random() < 0.3,
+        })
+    return tasks
+
+
+def percentiles(samples):
+    ordered = sorted(samples)
+
+    def pick(p):
+        return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+    return {
+        'count': len(ordered),
+        'min': round(ordered[0], 3),
+        'p50': round(pick(50), 3),
+        'p90': round(pick(90), 3),
+        'p99': round(pick(99), 3),
+        'max': round(ordered[-1], 3),
+        'mean': round(statistics.fmean(ordered), 3),
+    }
+
+
+def measure(app, action, repeat):
+    """重复执行 action，每次包含处理完挂起的事件（重绘），返回毫秒样本"""
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        action(i)
+        app.processEvents()
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def run_size(app, count, repeat, seed):
+    from ui.main_window import TodoWidget
+    from ui.animation_clock import shared_clock
+
+    work_dir = tempfile.mkdtemp(prefix='todo_bench_')
+    cwd = os.getcwd()
+    os.chdir(work_dir)
+    try:
+        with open(DATA_FILE, 'w', encoding='utf-8') as f:
+            json.dump({'tasks': generate_tasks(count, seed), 'pomodoro_stats': {}}, f, ensure_ascii=False)
+
+        # 动画直接跳到结束，避免计时器干扰测量
+        shared_clock().set_enabled(False)
+
+        start = time.perf_counter()
+        widget = TodoWidget()
+        widget.resize(*WINDOW_SIZES[1])
+        widget.show()
+        while widget.loader is not None:
+            widget.load_next_chunk()
+        while widget.index_builder is not None:
+            widget.build_next_index_chunk()
+        app.processEvents()
+        results = {'load': percentiles([(time.perf_counter() - start) * 1000])}
+
+        def resize(i):
+            widget.resize(*WINDOW_SIZES[i % len(WINDOW_SIZES)])
+            widget.layout_scheduler.flush()
+
+        def toggle_page(i):
+            if widget.current_page < widget.total_pages and i % 2 == 0:
+                widget.on_next_page()
+            else:
+                widget.on_prev_page()
+
+        def edit(i):
+            task = widget.task_model.task_at(0)
+            priorities = list(PRIORITY_VALUES)
+            widget.task_manager.update(task.id, priority=priorities[i % len(priorities)])
+            widget.update_table(task.id)
+
+        def add(i):
+            widget.task_input.setText(f'基准测试任务 {i}')
+            widget.add_task()
+
+        def search(i):
+            widget.search_input.setText(SEARCH_QUERIES[i % len(SEARCH_QUERIES)])
+            widget.apply_search()
+
+        scenarios = (
+            ('refresh_table', lambda i: widget.refresh_table()),
+            ('update_table', lambda i: widget.update_table()),
+            ('resize_font', resize),
+            ('sort_priority', lambda i: widget.on_header_clicked(1)),
+            ('sort_deadline', lambda i: widget.on_header_clicked(2)),
+            ('page_flip', toggle_page),
+            ('edit_priority', edit),
+            ('add_task', add),
+            ('search', search),
+        )
+        for name, action in scenarios:
+            results[name] = percentiles(measure(app, action, repeat))
+        widget.search_input.clear()
+        widget.apply_search()
+
+        widget.close()
+        widget.deleteLater()
+        app.processEvents()
+        return results
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=script_dir,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except Exception:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='TodoList 界面刷新基准测试')
+    parser.add_argument('--sizes', default=','.join(str(n) for n in DEFAULT_SIZES),
+                        help='逗号分隔的任务数量，默认 1000,10000,100000')
+    parser.add_argument('--repeat', type=int, default=30, help='每项操作的重复次数')
+    parser.add_argument('--seed', type=int, default=20240101, help='生成数据的随机种子')
+    parser.add_argument('--output', help='结果写入该文件，默认输出到标准输出')
+    args = parser.parse_args(argv)
+
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    sizes = [int(n) for n in args.sizes.split(',') if n.strip()]
+    report = {
+        'revision': git_revision(),
+        'python': platform.python_version(),
+        'qt': QT_VERSION_STR,
+        'pyqt': PYQT_VERSION_STR,
+        'platform': platform.platform(),
+        'qpa': os.environ.get('QT_QPA_PLATFORM'),
+        'seed': args.seed,
+        'repeat': args.repeat,
+        'unit': 'ms',
+        'results': {},
+    }
+    # 程序自身的日志（保存提示等）转到标准错误，标准输出只保留 JSON
+    with contextlib.redirect_stdout(sys.stderr):
+        for count in sizes:
+            print(f'运行基准测试: {count} 条任务')
+            report['results'][str(count)] = run_size(app, count, args.repeat, args.seed)
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(output + '\n')
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
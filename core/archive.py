@@ -0,0 +1,137 @@
+import json
+import os
+from collections import OrderedDict
+from .storage import write_json_atomic
+from .task import Task, task_key
+
+# 日期无法解析的任务归入该分段，排在最后
+UNDATED_SEGMENT = '0000-00'
+
+
+class TaskArchive:
+    """已完成任务的冷归档
+
+    按截止日期所在月份分段保存（如 2024-05.json），manifest.json 记录每段的任务数。
+    段内按日期降序排列，段之间按月份降序，没有日期的任务在最后一段，
+    与已完成分区的显示顺序一致（分页时没有日期的归档任务排在内存中没有日期的任务之后）。
+    只有翻页进入归档区域或搜索历史时才会读取对应的分段。
+    """
+
+    MANIFEST = 'manifest.json'
+
+    def __init__(self, archive_dir, cache_size=4):
+        self.archive_dir = archive_dir
+        self.cache_size = cache_size
+        self.cache = OrderedDict()  # segment -> [Task]，最近使用的分段
+        self.segments = self._load_manifest()  # segment -> count，按月份降序
+
+    def _load_manifest(self):
+        path = os.path.join(self.archive_dir, self.MANIFEST)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                segments = json.load(f).get('segments', {})
+        except (ValueError, OSError) as e:
+            print(f"读取归档清单失败: {e}")
+            return {}
+        return dict(sorted(segments.items(), reverse=True))
+
+    def _save_manifest(self):
+        write_json_atomic(os.path.join(self.archive_dir, self.MANIFEST), {'segments': self.segments})
+
+    def _segment_path(self, segment):
+        return os.path.join(self.archive_dir, f'{segment}.json')
+
+    def _read_segment(self, segment):
+        tasks = self.cache.get(segment)
+        if tasks is not None:
+            self.cache.move_to_end(segment)
+            return tasks
+        path = self._segment_path(segment)
+        tasks = []
+        if os.path.exists(path):
+            with open(path, 'r', encoding='utf-8') as f:
+                tasks = [Task.from_dict(t) for t in json.load(f)]
+        self.cache[segment] = tasks
+        while len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return tasks
+
+    def _write_segment(self, segment, tasks):
+        write_json_atomic(self._segment_path(segment), [t.to_dict() for t in tasks])
+        self.cache[segment] = tasks
+        self.cache.move_to_end(segment)
+        if tasks:
+            self.segments[segment] = len(tasks)
+        else:
+            self.segments.pop(segment, None)
+            os.remove(self._segment_path(segment))
+        self.segments = dict(sorted(self.segments.items(), reverse=True))
+
+    @staticmethod
+    def segment_of(task):
+        return task.deadline[:7] if task.deadline_ordinal else UNDATED_SEGMENT
+
+    def add(self, tasks):
+        """把一批已完成任务写入归档（按 id 去重）"""
+        if not tasks:
+            return
+        os.makedirs(self.archive_dir, exist_ok=True)
+        groups = {}
+        for task in tasks:
+            groups.setdefault(self.segment_of(task), []).append(task)
+        for segment, new_tasks in groups.items():
+            new_uids = {t.uid for t in new_tasks}
+            merged = [t for t in self._read_segment(segment) if t.uid not in new_uids]
+            merged.extend(new_tasks)
+            # 与已完成分区一致：日期降序，同一天保持先后顺序
+            merged.sort(key=lambda t: t.deadline_ordinal, reverse=True)
+            self._write_segment(segment, merged)
+        self._save_manifest()
+
+    def remove(self, task_id):
+        """从归档中删除任务，优先在已缓存的分段中查找"""
+        uid = task_key(task_id)
+        cached = list(reversed(self.cache.keys()))
+        others = [s for s in self.segments if s not in self.cache]
+        for segment in cached + others:
+            tasks = self._read_segment(segment)
+            for i, task in enumerate(tasks):
+                if task.uid == uid:
+                    self._write_segment(segment, tasks[:i] + tasks[i + 1:])
+                    self._save_manifest()
+                    return task
+        return None
+
+    def count(self):
+        return sum(self.segments.values())
+
+    def undated_count(self):
+        return self.segments.get(UNDATED_SEGMENT, 0)
+
+    def page(self, offset, limit):
+        """按显示顺序读取一页，只加载覆盖该范围的分段"""
+        result = []
+        start = 0
+        for segment, count in self.segments.items():
+            end = start + count
+            if end > offset and len(result) < limit:
+                tasks = self._read_segment(segment)
+                lo = max(0, offset - start)
+                result.extend(tasks[lo:lo + limit - len(result)])
+            if len(result) >= limit:
+                break
+            start = end
+        return result
+
+    def search(self, match, limit=50):
+        """在归档中搜索满足 match(task) 的历史任务，按显示顺序（从最近的分段开始）"""
+        result = []
+        for segment in self.segments:
+            for task in self._read_segment(segment):
+                if match(task):
+                    result.append(task)
+                    if len(result) >= limit:
+                        return result
+        return result
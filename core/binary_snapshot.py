@@ -0,0 +1,134 @@
+import json
+import mmap
+import os
+import struct
+from .task import Task, Priority
+
+MAGIC = b'TODOSNP2'
+# 文件头：魔数、任务数、对应 JSON 快照的 mtime_ns 与大小、番茄统计在字符串区中的位置
+HEADER = struct.Struct('<8sIqqII')
+# 定长任务记录：uid、优先级、标志位、保留、日期序数、文本/其他字段在字符串区中的偏移和长度
+RECORD = struct.Struct('<16sBBHIIIII')
+
+FLAG_COMPLETED = 1
+FLAG_STRING_ID = 2  # id 不是 UUID，原样保存在其他字段的 JSON 中
+
+
+def source_signature(source_file):
+    st = os.stat(source_file)
+    return st.st_mtime_ns, st.st_size
+
+
+def write_binary_snapshot(path, states, pomodoro_stats, source_file):
+    """根据 JSON 快照对应的任务生成二进制快照（定长记录表 + 字符串区）
+
+    states 为规范化后任务的 task_state 元组，读回的 Task 与从 JSON 加载转换得到的一致。
+    文件头记录 JSON 快照的修改时间和大小，二者不一致时视为过期。
+    """
+    heap = bytearray()
+
+    def put(text):
+        data = text.encode('utf-8')
+        offset = len(heap)
+        heap.extend(data)
+        return offset, len(data)
+
+    records = bytearray()
+    count = 0
+    for uid, text, priority, ordinal, completed, extra, tags in states:
+        flags = FLAG_COMPLETED if completed else 0
+        if tags:
+            extra = dict(extra or {}, tags=list(tags))
+        if isinstance(uid, int) and 0 <= uid < 1 << 128:
+            uid = uid.to_bytes(16, 'little')
+        else:
+            extra = dict(extra or {}, id=uid)
+            uid = bytes(16)
+            flags |= FLAG_STRING_ID
+        text_offset, text_len = put(text)
+        extra_offset, extra_len = put(json.dumps(extra, ensure_ascii=False)) if extra else (0, 0)
+        records += RECORD.pack(uid, int(priority), flags, 0, ordinal,
+                               text_offset, text_len, extra_offset, extra_len)
+        count += 1
+    stats_offset, stats_len = put(json.dumps(pomodoro_stats, ensure_ascii=False))
+
+    mtime_ns, size = source_signature(source_file)
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, count, mtime_ns, size, stats_offset, stats_len))
+        f.write(records)
+        f.write(heap)
+    os.replace(tmp_file, path)
+
+
+class BinarySnapshot:
+    """以 mmap 只读打开的二进制快照
+
+    任务按需从映射中解码，读取第一块时只会访问这些记录所在的页面。
+    JSON 仍是数据的正式格式，二进制快照只用于加快启动。
+    """
+
+    def __init__(self, path):
+        self._file = open(path, 'rb')
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            magic, self.count, self.mtime_ns, self.size, self._stats_offset, self._stats_len = \
+                HEADER.unpack_from(self._mm, 0)
+            if magic != MAGIC:
+                raise ValueError("二进制快照格式错误")
+            self._heap = HEADER.size + self.count * RECORD.size
+            if self._heap + self._stats_offset + self._stats_len > len(self._mm):
+                raise ValueError("二进制快照不完整")
+        except Exception:
+            self.close()
+            raise
+
+    @classmethod
+    def open_if_fresh(cls, path, source_file):
+        """打开与 source_file 对应的二进制快照，缺失、损坏或已过期时返回 None"""
+        if not (os.path.exists(path) and os.path.exists(source_file)):
+            return None
+        try:
+            snapshot = cls(path)
+        except (OSError, ValueError, struct.error) as e:
+            print(f"二进制快照无法使用: {e}")
+            return None
+        if (snapshot.mtime_ns, snapshot.size) != source_signature(source_file):
+            snapshot.close()
+            return None
+        return snapshot
+
+    def __len__(self):
+        return self.count
+
+    def _string(self, offset, length):
+        start = self._heap + offset
+        return str(self._mm[start:start + length], 'utf-8')
+
+    def task(self, i):
+        uid, priority, flags, _, ordinal, text_offset, text_len, extra_offset, extra_len = \
+            RECORD.unpack_from(self._mm, HEADER.size + i * RECORD.size)
+        extra = json.loads(self._string(extra_offset, extra_len)) if extra_len else None
+        if flags & FLAG_STRING_ID:
+            uid = extra.pop('id')
+        else:
+            uid = int.from_bytes(uid, 'little')
+        tags = tuple(extra.pop('tags', ())) if extra else ()
+        return Task(uid, self._string(text_offset, text_len), Priority(priority), ordinal,
+                    bool(flags & FLAG_COMPLETED), extra or None, tags)
+
+    def iter_chunks(self, chunk_size):
+        for start in range(0, self.count, chunk_size):
+            yield [self.task(i) for i in range(start, min(start + chunk_size, self.count))]
+
+    def pomodoro_stats(self):
+        return json.loads(self._string(self._stats_offset, self._stats_len))
+
+    def close(self):
+        # Windows 下映射未关闭时无法替换文件，加载完成后立即释放
+        if getattr(self, '_mm', None) is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file:
+            self._file.close()
+            self._file = None
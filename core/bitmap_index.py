@@ -0,0 +1,140 @@
+import re
+from collections import Counter
+
+# 字节值 -> 其中为 1 的位序号，解码位图时查表
+BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+NONZERO_RUN = re.compile(rb'[^\x00]+')
+
+
+class BitmapIndex:
+    """任务集合的位图索引
+
+    每个任务占一个位（slot），标签、优先级和完成状态各有一个位图，
+    保存为 bytearray，增删只改一个字节。查询时把涉及的位图转成整数，
+    AND/OR/NOT 直接用整数的位运算完成，最后把结果位图解码回任务。
+    位图的键：('tag', 标签名)、('priority', Priority)、'completed'、'all'（全部任务）。
+    """
+
+    def __init__(self):
+        self.slots = {}     # uid -> slot
+        self.tasks = []     # slot -> Task，空位为 None
+        self.free = []      # 删除任务后可复用的 slot
+        self.bitmaps = {}   # key -> bytearray
+        self.tag_counts = Counter()
+
+    def _keys(self, task):
+        keys = ['all', ('priority', task.priority)]
+        if task.completed:
+            keys.append('completed')
+        keys.extend(('tag', tag) for tag in task.tags)
+        return keys
+
+    def rebuild(self, tasks):
+        """按任务顺序依次分配 slot，先收集各位图的 slot 再一次性写入"""
+        self.tasks = list(tasks)
+        self.slots = {task.uid: slot for slot, task in enumerate(self.tasks)}
+        self.free = []
+        members = {'completed': []}
+        completed = members['completed']
+        by_tag = {}
+        for slot, task in enumerate(self.tasks):
+            key = ('priority', task.priority)
+            bucket = members.get(key)
+            if bucket is None:
+                members[key] = [slot]
+            else:
+                bucket.append(slot)
+            if task.completed:
+                completed.append(slot)
+            for tag in task.tags:
+                bucket = by_tag.get(tag)
+                if bucket is None:
+                    by_tag[tag] = [slot]
+                else:
+                    bucket.append(slot)
+        count = len(self.tasks)
+        size = (count + 7) >> 3
+        everything = bytearray(b'\xff' * size)
+        if count & 7:
+            everything[-1] = (1 << (count & 7)) - 1
+        self.bitmaps = {'all': everything}
+        for key, slots in members.items():
+            self.bitmaps[key] = self._pack(slots, size)
+        for tag, slots in by_tag.items():
+            self.bitmaps[('tag', tag)] = self._pack(slots, size)
+        self.tag_counts = Counter({tag: len(slots) for tag, slots in by_tag.items()})
+
+    @staticmethod
+    def _pack(slots, size):
+        bits = bytearray(size)
+        for slot in slots:
+            bits[slot >> 3] |= 1 << (slot & 7)
+        return bits
+
+    def add(self, task):
+        slot = self.free.pop() if self.free else len(self.tasks)
+        if slot == len(self.tasks):
+            self.tasks.append(task)
+        else:
+            self.tasks[slot] = task
+        self.slots[task.uid] = slot
+        byte, mask = slot >> 3, 1 << (slot & 7)
+        for key in self._keys(task):
+            bits = self.bitmaps.get(key)
+            if bits is None:
+                bits = self.bitmaps[key] = bytearray()
+            if len(bits) <= byte:
+                bits.extend(bytes(byte + 1 - len(bits)))
+            bits[byte] |= mask
+        self.tag_counts.update(task.tags)
+
+    def discard(self, task):
+        """移除任务（须在修改优先级、完成状态、标签之前调用）"""
+        slot = self.slots.pop(task.uid, None)
+        if slot is None:
+            return
+        byte, mask = slot >> 3, ~(1 << (slot & 7)) & 0xFF
+        for key in self._keys(task):
+            bits = self.bitmaps.get(key)
+            if bits is not None and byte < len(bits):
+                bits[byte] &= mask
+        self.tag_counts.subtract(task.tags)
+        for tag in task.tags:
+            if self.tag_counts[tag] <= 0:
+                del self.tag_counts[tag]
+                self.bitmaps.pop(('tag', tag), None)
+        self.tasks[slot] = None
+        self.free.append(slot)
+
+    def bitmap(self, key):
+        """位图的整数形式，不存在时为 0"""
+        bits = self.bitmaps.get(key)
+        return int.from_bytes(bits, 'little') if bits else 0
+
+    def any_of(self, keys):
+        """多个位图的 OR"""
+        result = 0
+        for key in keys:
+            result |= self.bitmap(key)
+        return result
+
+    def from_uids(self, uids):
+        """把 uid 集合（如文本搜索、截止日期索引的结果）转为位图，便于与其他位图求交"""
+        slots = self.slots
+        return int.from_bytes(self._pack((slots[uid] for uid in uids if uid in slots),
+                                         (len(self.tasks) + 7) >> 3), 'little')
+
+    def tasks_of(self, bits):
+        """把结果位图解码为任务列表（按 slot 顺序）"""
+        if bits <= 0:
+            return []
+        tasks = self.tasks
+        data = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+        result = []
+        # 用正则在 C 层跳过连续的全零字节，稀疏结果只需处理少数几段
+        for run in NONZERO_RUN.finditer(data):
+            base = run.start() << 3
+            for byte in run.group():
+                result.extend([tasks[base + bit] for bit in BYTE_BITS[byte]])
+                base += 8
+        return result
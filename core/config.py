@@ -52,3 +52,43 @@ def get_current_version():
 # Constants
 DATA_FILE = 'todo_data.json'
 PRIORITY_VALUES = {'不紧急不重要': 0, '紧急不重要': 1, '重要不紧急': 2, '紧急重要': 3}
+
+# 存储后端：'json'（JSON 快照 + 变更日志）或 'sqlite'（首次使用时自动从 todo_data.json 迁移）
+STORAGE_BACKEND = 'json'
+
+# 变更日志：单条修改追加写入日志，累计到阈值后在后台压缩回快照
+JOURNAL_ENABLED = True
+JOURNAL_COMPACT_THRESHOLD = 500
+
+# 每次写入快照时滚动保留的历史快照份数（todo_data.json.bak1 为最新），主文件损坏时自动回退
+SNAPSHOT_BACKUPS = 3
+
+# 后台写入：修改先标记为脏，由写线程在延迟窗口内合并为一次写入
+WRITE_BEHIND_ENABLED = True
+WRITE_LATENCY_MS = 300
+
+# 冷归档：截止日期早于该天数的已完成任务在启动时移入按月分段的归档文件（如设为 90），
+# 默认 None 不自动归档；已有的归档仍可翻页、搜索，取消完成即移回主数据
+ARCHIVE_AFTER_DAYS = None
+# 搜索/过滤时附加在结果末尾的归档任务最多条数（从最近的月份开始查找）
+ARCHIVE_SEARCH_LIMIT = 200
+
+# 流式加载：每次解析并交给界面的任务条数
+LOAD_CHUNK_SIZE = 2000
+
+# 搜索索引在界面空闲时分片建立，每片最多占用的时间（毫秒），避免阻塞滚动和输入
+SEARCH_INDEX_SLICE_MS = 4
+
+# 二进制快照：保存 JSON 快照时同时生成 todo_data.json.bin（定长记录 + 字符串区），启动时用 mmap 读取；
+# 与 JSON 文件不一致时视为过期，自动重新生成
+BINARY_SNAPSHOT_ENABLED = True
+
+# 连续滚动：用虚拟化的滚动列表代替每页 30 条的分页，只读取可见行附近的任务
+CONTINUOUS_SCROLL = False
+
+# 界面动画（完成淡出、滚动等）由一个全局时钟驱动，低功耗时可设为 False 直接跳到结束状态
+ANIMATIONS_ENABLED = True
+
+# 性能浮层（开发用）：Ctrl+Shift+P 切换，或设置该环境变量为 1 启动时即显示；每项指标保留的历史样本数
+PERF_HUD_ENV = 'TODO_PERF_HUD'
+PERF_HUD_HISTORY = 120
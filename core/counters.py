@@ -0,0 +1,52 @@
+from datetime import date
+from .task import Priority
+
+
+class TaskCounters:
+    """随任务增删改增量维护的计数，读取时不遍历任务
+
+    open_by_priority 为各象限的未完成任务数；今天完成的任务按 completed_date 字段
+    （完成时记录的日期）统计，跨天后自动归零。增删要在修改任务之前/之后成对调用 discard/add。
+    """
+
+    def __init__(self):
+        self.open_by_priority = dict.fromkeys(Priority, 0)
+        self.today = date.today().isoformat()
+        self.completed_today = 0
+
+    def rebuild(self, tasks):
+        self.open_by_priority = dict.fromkeys(Priority, 0)
+        self.today = date.today().isoformat()
+        self.completed_today = 0
+        for task in tasks:
+            if task.completed:
+                if task.get('completed_date') == self.today:
+                    self.completed_today += 1
+            else:
+                self.open_by_priority[task.priority] += 1
+
+    def _roll(self):
+        today = date.today().isoformat()
+        if today != self.today:
+            self.today = today
+            self.completed_today = 0
+
+    def add(self, task):
+        if not task.completed:
+            self.open_by_priority[task.priority] += 1
+            return
+        self._roll()
+        if task.get('completed_date') == self.today:
+            self.completed_today += 1
+
+    def discard(self, task):
+        if not task.completed:
+            self.open_by_priority[task.priority] -= 1
+            return
+        self._roll()
+        if task.get('completed_date') == self.today:
+            self.completed_today -= 1
+
+    def count_completed_today(self):
+        self._roll()
+        return self.completed_today
@@ -0,0 +1,63 @@
+from bisect import bisect_left, bisect_right
+
+
+class DeadlineIndex:
+    """按截止日期排序的任务索引
+
+    未完成和已完成任务各一个分区，每个分区是按日期序数排序的数组和平行的 uid 数组，
+    区间查询和计数都用 bisect 定位，计数不需要遍历任务。没有截止日期的任务序数为 0，排在最前。
+    增删要在修改任务的截止日期或完成状态之前/之后成对调用 discard/add。
+    """
+
+    def __init__(self):
+        self.partitions = {False: ([], []), True: ([], [])}  # completed -> (ordinals, uids)
+
+    def rebuild(self, tasks):
+        for completed in (False, True):
+            pairs = sorted(((t.deadline_ordinal, t.uid) for t in tasks if t.completed == completed),
+                           key=lambda pair: pair[0])
+            self.partitions[completed] = ([o for o, _ in pairs], [u for _, u in pairs])
+
+    def add(self, task):
+        ordinals, uids = self.partitions[task.completed]
+        pos = bisect_right(ordinals, task.deadline_ordinal)
+        ordinals.insert(pos, task.deadline_ordinal)
+        uids.insert(pos, task.uid)
+
+    def discard(self, task):
+        ordinals, uids = self.partitions[task.completed]
+        pos = bisect_left(ordinals, task.deadline_ordinal)
+        end = bisect_right(ordinals, task.deadline_ordinal, pos)
+        for i in range(pos, end):
+            if uids[i] == task.uid:
+                del ordinals[i]
+                del uids[i]
+                return
+
+    def _bounds(self, ordinals, start, end):
+        low = 0 if start is None else bisect_left(ordinals, start)
+        high = len(ordinals) if end is None else bisect_right(ordinals, end)
+        return low, max(low, high)
+
+    def _selected(self, completed):
+        return (False, True) if completed is None else (completed,)
+
+    def range(self, start=None, end=None, completed=None):
+        """截止日期在 [start, end]（日期序数，None 表示不限）内的任务 uid，按日期升序（分区各自有序）"""
+        result = []
+        for part in self._selected(completed):
+            ordinals, uids = self.partitions[part]
+            low, high = self._bounds(ordinals, start, end)
+            result.extend(uids[low:high])
+        return result
+
+    def count(self, start=None, end=None, completed=None):
+        """截止日期在 [start, end] 内的任务数"""
+        total = 0
+        for part in self._selected(completed):
+            low, high = self._bounds(self.partitions[part][0], start, end)
+            total += high - low
+        return total
+
+    def __len__(self):
+        return sum(len(ordinals) for ordinals, _ in self.partitions.values())
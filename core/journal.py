@@ -0,0 +1,113 @@
+import json
+import os
+import threading
+
+
+class TaskJournal:
+    """任务变更日志（追加写）
+
+    单条修改以紧凑的 JSON 行追加到日志文件，而不是每次重写整个数据文件。
+    记录格式：
+        {"op": "add", "task": {...}}
+        {"op": "update", "id": "...", "fields": {...}}
+        {"op": "delete", "id": "..."}
+        {"op": "pomodoro", "date": "yyyy-MM-dd", "count": 3}
+    """
+
+    def __init__(self, path):
+        self.path = path
+        # 压缩期间被轮换出去的旧日志段，快照写完后删除
+        self.compacting_path = path + '.compacting'
+        self.record_count = 0
+        self.lock = threading.Lock()
+
+    def append(self, records):
+        """追加一批变更记录（一次写入）"""
+        lines = ''.join(json.dumps(r, ensure_ascii=False, separators=(',', ':')) + '\n' for r in records)
+        with self.lock:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.write(lines)
+                f.flush()
+                os.fsync(f.fileno())
+            self.record_count += len(records)
+
+    def replay(self, tasks, pomodoro_stats):
+        """在快照数据上按顺序重放日志（先重放压缩中的旧段，再重放当前段）"""
+        index = None  # 没有日志时不必为整个列表建立索引
+        removed = False
+        replayed = 0
+        for path in (self.compacting_path, self.path):
+            for record in self._read_records(path):
+                if index is None:
+                    # 快照中无效的条目（如 null）由 TaskManager 跳过，这里不参与索引
+                    index = {t.get('id'): i for i, t in enumerate(tasks) if hasattr(t, 'get')}
+                op = record.get('op')
+                if op == 'add':
+                    task = record.get('task', {})
+                    pos = index.get(task.get('id'))
+                    if pos is None:
+                        index[task.get('id')] = len(tasks)
+                        tasks.append(task)
+                    else:
+                        tasks[pos] = task
+                elif op == 'update':
+                    pos = index.get(record.get('id'))
+                    if pos is not None and tasks[pos] is not None:
+                        tasks[pos].update(record.get('fields', {}))
+                elif op == 'delete':
+                    pos = index.pop(record.get('id'), None)
+                    if pos is not None:
+                        # 先占位，最后统一清理，避免重放时反复移动列表
+                        tasks[pos] = None
+                        removed = True
+                elif op == 'pomodoro':
+                    pomodoro_stats[record.get('date')] = record.get('count', 0)
+                replayed += 1
+        if removed:
+            tasks[:] = [t for t in tasks if t is not None]
+        self.record_count = replayed
+        return replayed
+
+    def _read_records(self, path):
+        if not os.path.exists(path):
+            return
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    record = None  # 崩溃时最后一行可能只写了一半，忽略即可
+                if isinstance(record, dict):
+                    yield record
+                else:
+                    print(f"跳过损坏的日志记录: {line[:40]}")
+
+    def rotate(self):
+        """把当前日志段轮换为压缩段，后续追加写入新的日志文件
+
+        返回 False 表示上一次压缩尚未完成。
+        """
+        with self.lock:
+            if os.path.exists(self.compacting_path):
+                return False
+            if os.path.exists(self.path):
+                os.replace(self.path, self.compacting_path)
+            self.record_count = 0
+            return True
+
+    def finish_compaction(self):
+        """快照已落盘，删除压缩段"""
+        with self.lock:
+            if os.path.exists(self.compacting_path):
+                os.remove(self.compacting_path)
+
+    def clear(self):
+        """完整快照写入后清空所有日志段"""
+        with self.lock:
+            for path in (self.compacting_path, self.path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.record_count = 0
@@ -0,0 +1,94 @@
+from bisect import bisect_left, bisect_right
+from itertools import chain
+
+
+class OrderedTaskView:
+    """按显示顺序增量维护的任务视图
+
+    - 未完成分区：按 rank（排序后/添加时的列表位置）升序
+    - 已完成分区：按日期降序，同一天按 rank 升序
+    两个分区都用“有序 key 列表 + 平行任务列表”保存，增删改通过 bisect 定位，
+    取一页只需切片，不再依赖任务总数。
+    """
+
+    def __init__(self):
+        self.ranks = {}  # uid -> rank
+        self.next_rank = 0
+        self.incomplete_keys = []
+        self.incomplete = []
+        self.completed_keys = []
+        self.completed = []
+
+    def rebuild(self, tasks):
+        """按列表顺序重建（加载、排序之后调用）"""
+        self.ranks = {t.uid: i for i, t in enumerate(tasks)}
+        self.next_rank = len(tasks)
+        incomplete = [t for t in tasks if not t.completed]
+        completed = sorted((t for t in tasks if t.completed), key=self._completed_key)
+        self.incomplete = incomplete
+        self.incomplete_keys = [self.ranks[t.uid] for t in incomplete]
+        self.completed = completed
+        self.completed_keys = [self._completed_key(t) for t in completed]
+
+    def _completed_key(self, task):
+        return (-task.deadline_ordinal, self.ranks[task.uid])
+
+    def _partition(self, task):
+        if task.completed:
+            return self.completed_keys, self.completed, self._completed_key(task)
+        return self.incomplete_keys, self.incomplete, self.ranks[task.uid]
+
+    def insert(self, task):
+        """插入任务；新任务排在未完成分区末尾"""
+        if task.uid not in self.ranks:
+            self.ranks[task.uid] = self.next_rank
+            self.next_rank += 1
+        keys, items, key = self._partition(task)
+        pos = bisect_right(keys, key)
+        keys.insert(pos, key)
+        items.insert(pos, task)
+
+    def discard(self, task, forget=False):
+        """移除任务（必须在修改 completed/deadline 之前调用）"""
+        if task.uid not in self.ranks:
+            return
+        keys, items, key = self._partition(task)
+        pos = bisect_left(keys, key)
+        if pos < len(keys) and keys[pos] == key and items[pos] is task:
+            del keys[pos]
+            del items[pos]
+        if forget:
+            del self.ranks[task.uid]
+
+    def display_key(self, task):
+        """任务在显示顺序中的排序键（任务须在视图中）"""
+        if task.completed:
+            return 1, self._completed_key(task)
+        return 0, self.ranks[task.uid]
+
+    def ordered(self, tasks):
+        """把任务集合按显示顺序排列：集合较大时沿视图筛选，较小时按排序键排序"""
+        if len(tasks) * 8 > len(self):
+            uids = {t.uid for t in tasks}
+            return [t for t in chain(self.incomplete, self.completed) if t.uid in uids]
+        return sorted(tasks, key=self.display_key)
+
+    def undated_count(self):
+        """没有截止日期的已完成任务数（排在已完成分区末尾）"""
+        return len(self.completed_keys) - bisect_left(self.completed_keys, (0,))
+
+    def page(self, offset, limit):
+        """按显示顺序取一页"""
+        end = offset + limit
+        split = len(self.incomplete)
+        if end <= split:
+            return self.incomplete[offset:end]
+        if offset >= split:
+            return self.completed[offset - split:end - split]
+        return self.incomplete[offset:] + self.completed[:end - split]
+
+    def all(self):
+        return self.incomplete + self.completed
+
+    def __len__(self):
+        return len(self.incomplete) + len(self.completed)
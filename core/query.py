@@ -0,0 +1,145 @@
+import re
+from datetime import date, timedelta
+from .task import Priority, PRIORITY_BY_LABEL, LEGACY_PRIORITIES, normalize_tags
+
+# 字段名（含别名） -> 规范字段
+FIELD_ALIASES = {
+    'p': 'priority', 'priority': 'priority', '优先级': 'priority',
+    'due': 'due', 'd': 'due', '截止': 'due',
+    'done': 'done', '完成': 'done',
+    'tag': 'tag', 't': 'tag', '标签': 'tag',
+}
+DONE_VALUES = {'yes': True, 'y': True, 'true': True, '1': True, '是': True,
+               'no': False, 'n': False, 'false': False, '0': False, '否': False}
+TOKEN_RE = re.compile(r'([^\s<>=:]+)(<=|>=|<|>|=|:)(.*)')
+
+
+class QueryError(ValueError):
+    """过滤条件无法解析"""
+
+
+class TaskQuery:
+    """解析后的查询：各条件取交集，未指定的条件为 None
+
+    priorities 为 Priority 集合，deadline_min/deadline_max 为闭区间的日期序数，
+    completed 为完成状态，terms 为文本搜索词（交给搜索索引）。
+    tag_groups 为标签集合的列表，每组至少命中一个、各组都要满足；tags_excluded 中的标签都不能有。
+    """
+
+    __slots__ = ('priorities', 'deadline_min', 'deadline_max', 'completed', 'terms',
+                 'tag_groups', 'tags_excluded')
+
+    def __init__(self):
+        self.priorities = None
+        self.deadline_min = None
+        self.deadline_max = None
+        self.completed = None
+        self.terms = []
+        self.tag_groups = []
+        self.tags_excluded = set()
+
+    def has_deadline(self):
+        return self.deadline_min is not None or self.deadline_max is not None
+
+    def has_tags(self):
+        return bool(self.tag_groups or self.tags_excluded)
+
+    def is_empty(self):
+        return (self.priorities is None and not self.has_deadline()
+                and self.completed is None and not self.terms and not self.has_tags())
+
+
+def parse_query(text, today=None):
+    """把查询文本解析为 TaskQuery
+
+    支持的条件（空白分隔，可组合）：
+      p:紧急重要 / p:紧急重要,重要不紧急 / p:3   优先级（名称或 0~3）
+      due<2025-12-31  due>=today  due<=+7  due:12-01   截止日期（<、<=、>、>=、=、:）
+      done:no / done:yes                        完成状态
+      #工作  #工作|学习  -#家里                   标签（同时有 / 有其一 / 没有），也可写 tag:工作
+    其他内容作为文本搜索词。日期可写 yyyy-MM-dd、MM-dd（今年）、today/tomorrow、+N/-N（相对今天的天数）。
+    """
+    today = today or date.today()
+    query = TaskQuery()
+    for token in (text or '').split():
+        if token[0] in '-!' and token[1:2] == '#':
+            query.tags_excluded.update(_parse_tags(token[2:], token))
+            continue
+        if token[0] == '#':
+            query.tag_groups.append(set(_parse_tags(token[1:], token)))
+            continue
+        match = TOKEN_RE.fullmatch(token)
+        field = FIELD_ALIASES.get(match.group(1).lower()) if match else None
+        if field is None:
+            query.terms.append(token)
+            continue
+        op, value = match.group(2), match.group(3)
+        if not value:
+            raise QueryError(f"缺少条件值: {token}")
+        if field == 'priority':
+            if op not in (':', '='):
+                raise QueryError(f"优先级只支持 p:名称: {token}")
+            priorities = {_parse_priority(v) for v in value.split(',') if v}
+            query.priorities = priorities if query.priorities is None else query.priorities & priorities
+        elif field == 'tag':
+            if op not in (':', '='):
+                raise QueryError(f"标签只支持 tag:名称: {token}")
+            query.tag_groups.append(set(_parse_tags(value, token)))
+        elif field == 'done':
+            if op not in (':', '=') or value.lower() not in DONE_VALUES:
+                raise QueryError(f"完成状态只支持 done:yes/no: {token}")
+            query.completed = DONE_VALUES[value.lower()]
+        else:
+            _apply_deadline(query, op, _parse_date(value, today).toordinal())
+    return query
+
+
+def _parse_tags(value, token):
+    tags = normalize_tags(value.split('|'))
+    if not tags:
+        raise QueryError(f"缺少标签名: {token}")
+    return tags
+
+
+def _parse_priority(value):
+    if value.isdigit() and int(value) in Priority._value2member_map_:
+        return Priority(int(value))
+    label = LEGACY_PRIORITIES.get(value, value)
+    if label not in PRIORITY_BY_LABEL:
+        raise QueryError(f"未知的优先级: {value}")
+    return PRIORITY_BY_LABEL[label]
+
+
+def _parse_date(value, today):
+    value = value.lower()
+    if value in ('today', '今天'):
+        return today
+    if value in ('tomorrow', '明天'):
+        return today + timedelta(days=1)
+    try:
+        if value[0] in '+-' and value[1:].isdigit():
+            return today + timedelta(days=int(value))
+        if len(value) <= 5:
+            month, day = value.split('-')
+            return date(today.year, int(month), int(day))
+        return date.fromisoformat(value)
+    except (ValueError, OverflowError):
+        raise QueryError(f"无法识别的日期: {value}") from None
+
+
+def _apply_deadline(query, op, ordinal):
+    low = high = None
+    if op == '<':
+        high = ordinal - 1
+    elif op == '<=':
+        high = ordinal
+    elif op == '>':
+        low = ordinal + 1
+    elif op == '>=':
+        low = ordinal
+    else:
+        low = high = ordinal
+    if low is not None:
+        query.deadline_min = low if query.deadline_min is None else max(query.deadline_min, low)
+    if high is not None:
+        query.deadline_max = high if query.deadline_max is None else min(query.deadline_max, high)
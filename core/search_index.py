@@ -0,0 +1,84 @@
+class NgramIndex:
+    """任务文本的二元组倒排索引
+
+    中文没有空格分词，按字切分：相邻两个字（二元组）对应一组任务 uid。
+    查询时取查询词所有二元组对应集合的交集作为候选，长于两个字的查询再用
+    子串匹配确认；单字查询直接扫描归一化后的文本。文本先 casefold，英文不区分大小写。
+    """
+
+    def __init__(self):
+        self.postings = {}  # 二元组 -> {uid}
+        self.texts = {}     # uid -> 归一化后的文本
+        self.ready = False  # 分块建立时，全部任务加入后才为 True
+
+    @staticmethod
+    def normalize(text):
+        return (text or '').casefold()
+
+    @staticmethod
+    def grams(text):
+        return set(map(str.__add__, text, text[1:]))
+
+    def add(self, task):
+        uid = task.uid
+        if uid in self.texts:
+            self.remove(task)
+        text = self.texts[uid] = self.normalize(task.text)
+        postings = self.postings
+        for gram in self.grams(text):
+            bucket = postings.get(gram)
+            if bucket is None:
+                postings[gram] = {uid}
+            else:
+                bucket.add(uid)
+
+    def remove(self, task):
+        text = self.texts.pop(task.uid, None)
+        if text is None:
+            return
+        for gram in self.grams(text):
+            bucket = self.postings.get(gram)
+            if bucket is not None:
+                bucket.discard(task.uid)
+                if not bucket:
+                    del self.postings[gram]
+
+    def __contains__(self, uid):
+        return uid in self.texts
+
+    def __len__(self):
+        return len(self.texts)
+
+    def terms(self, query):
+        return self.normalize(query).split()
+
+    def match(self, terms):
+        """返回同时包含所有查询词的任务 uid 集合，先算命中少的词"""
+        result = None
+        for term in sorted(terms, key=len, reverse=True):
+            if result is not None and len(result) < 64:
+                # 候选已经很少，直接逐条确认比再求交集快
+                texts = self.texts
+                result = {uid for uid in result if term in texts[uid]}
+            else:
+                candidates = self._match_term(term)
+                result = candidates if result is None else result & candidates
+            if not result:
+                return set()
+        return result or set()
+
+    def _match_term(self, term):
+        if len(term) == 1:
+            return {uid for uid, text in self.texts.items() if term in text}
+        buckets = []
+        for gram in self.grams(term):
+            bucket = self.postings.get(gram)
+            if not bucket:
+                return set()
+            buckets.append(bucket)
+        buckets.sort(key=len)
+        candidates = buckets[0].intersection(*buckets[1:])
+        if len(term) > 2:
+            texts = self.texts
+            candidates = {uid for uid in candidates if term in texts[uid]}
+        return candidates
@@ -0,0 +1,561 @@
+import json
+import os
+import shutil
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from .journal import TaskJournal
+from .config import (JOURNAL_ENABLED, JOURNAL_COMPACT_THRESHOLD, SNAPSHOT_BACKUPS, LOAD_CHUNK_SIZE,
+                     BINARY_SNAPSHOT_ENABLED)
+from .stream_loader import JsonTaskStream
+from .binary_snapshot import BinarySnapshot, write_binary_snapshot
+from .task import Task, task_from_data, task_state, deadline_ordinal
+
+# 任务字典中有独立列的字段，其余字段存入 extra 列（JSON）
+TASK_COLUMNS = ('id', 'text', 'priority', 'deadline', 'completed')
+
+
+class StorageBackend(ABC):
+    """存储后端接口
+
+    TaskManager 在内存中保留完整任务列表，后端只负责持久化：
+    - iter_load() 分块加载，load() / save_all() 读写完整数据
+    - apply() 持久化单条变更记录（格式与 TaskJournal 相同）
+    - fetch_display_ids() 可选，由后端直接回答分页显示查询
+    incremental 为 False 的后端只能通过 save_all() 保存。
+    """
+
+    incremental = False
+
+    def load(self):
+        """返回 (tasks, pomodoro_stats)"""
+        tasks = []
+        pomodoro_stats = drain(self.iter_load(tasks, LOAD_CHUNK_SIZE))
+        return tasks, pomodoro_stats
+
+    @abstractmethod
+    def iter_load(self, tasks, chunk_size):
+        """分块加载的生成器：每向 tasks 追加一块任务就产出一次加载进度（0~1），
+        结束时返回 pomodoro_stats"""
+
+    @abstractmethod
+    def save_all(self, tasks, pomodoro_stats):
+        """保存完整数据"""
+
+    def apply(self, records):
+        """持久化一批变更记录，返回 False 表示后端无法增量写入，需要完整保存"""
+        return False
+
+    def needs_compaction(self):
+        return False
+
+    def compact(self, tasks, pomodoro_stats, wait=False):
+        pass
+
+    def fetch_display_ids(self, offset, limit):
+        """按显示顺序返回一页任务 id，返回 None 表示不支持"""
+        return None
+
+    def preserve(self, move=False):
+        """加载出错时保留当前数据文件的副本，之后的保存不会覆盖或轮换掉它
+
+        move 为 True 时把数据文件移开（下次加载回退到备份），返回是否还有可回退的数据。
+        """
+        return False
+
+    def close(self):
+        pass
+
+
+class JsonStorage(StorageBackend):
+    """JSON 快照 + 追加写变更日志"""
+
+    def __init__(self, data_file, use_journal=JOURNAL_ENABLED, use_binary=BINARY_SNAPSHOT_ENABLED):
+        self.data_file = data_file
+        self.journal = TaskJournal(data_file + '.journal') if use_journal else None
+        # 与 JSON 快照同步生成的二进制快照，启动时优先读取
+        self.binary_file = data_file + '.bin' if use_binary else None
+        self.incremental = self.journal is not None
+        self.snapshot_lock = threading.Lock()
+        self.snapshot_generation = 0  # 每次完整保存递增，用于丢弃过期的后台压缩结果
+        self.compaction_thread = None
+        self.recovered = False  # 本次加载是否从备份恢复
+
+    def iter_load(self, tasks, chunk_size):
+        self.recovered = False
+        pomodoro_stats = None
+        if self.binary_file:
+            pomodoro_stats = yield from self._iter_binary(tasks, chunk_size)
+        if pomodoro_stats is None:
+            pomodoro_stats = yield from self._iter_snapshot(tasks, chunk_size)
+            if self.binary_file and not self.recovered and os.path.exists(self.data_file):
+                # 二进制快照缺失或已过期：按刚读入的 JSON 快照重新生成（此时尚未重放日志），
+                # 与加载时一样先规范化为 Task（调用方可能已逐块转换），二进制快照中只保存其字段值
+                self._write_binary(task_states(tasks), pomodoro_stats)
+        # 在快照之上重放变更日志
+        if self.journal:
+            replayed = self.journal.replay(tasks, pomodoro_stats)
+            if replayed:
+                print(f"重放变更日志: {replayed} 条，任务: {len(tasks)} 条")
+        if self.recovered:
+            # 用恢复出的数据重建主文件（调用方可能已把任务转换为 Task，无效条目如 null 由调用方跳过）
+            self.save_all([dict(t) for t in tasks if hasattr(t, 'keys')], pomodoro_stats)
+        return pomodoro_stats
+
+    def save_all(self, tasks, pomodoro_stats):
+        with self.snapshot_lock:
+            self.snapshot_generation += 1
+            self._write_snapshot(tasks, pomodoro_stats)
+            if self.journal:
+                self.journal.clear()
+
+    def backup_path(self, n):
+        return f"{self.data_file}.bak{n}"
+
+    def _iter_binary(self, tasks, chunk_size):
+        """从二进制快照分块读取，快照不可用时返回 None"""
+        snapshot = BinarySnapshot.open_if_fresh(self.binary_file, self.data_file)
+        if snapshot is None:
+            return None
+        try:
+            for chunk in snapshot.iter_chunks(chunk_size):
+                tasks.extend(chunk)
+                yield len(tasks) / len(snapshot)
+            pomodoro_stats = snapshot.pomodoro_stats()
+        except (ValueError, UnicodeDecodeError) as e:
+            print(f"二进制快照已损坏: {e}")
+            del tasks[:]
+            return None
+        finally:
+            snapshot.close()
+        print(f"加载二进制快照，任务: {len(tasks)} 条，番茄记录: {len(pomodoro_stats)} 天")
+        return pomodoro_stats
+
+    def _write_binary(self, states, pomodoro_stats):
+        try:
+            write_binary_snapshot(self.binary_file, states, pomodoro_stats, self.data_file)
+        except Exception as e:
+            # 二进制快照只是加速用的副本，写入失败下次仍可从 JSON 加载
+            print(f"写入二进制快照失败: {e}")
+
+    def _iter_snapshot(self, tasks, chunk_size):
+        """流式读取快照；主文件损坏或缺失时回退到最新的有效备份
+
+        正常启动只读取主文件，备份仅在主文件无法解析时才会被读取。
+        """
+        main_exists = os.path.exists(self.data_file)
+        if main_exists:
+            try:
+                return (yield from stream_json_data(self.data_file, tasks, chunk_size))
+            except (ValueError, UnicodeDecodeError) as e:
+                print(f"数据文件已损坏: {e}")
+                del tasks[:]
+                # 保留损坏的文件供手动检查，且不会被后续保存轮换进备份
+                os.replace(self.data_file, free_path(self.data_file + '.corrupt'))
+
+        for n in range(1, SNAPSHOT_BACKUPS + 1):
+            path = self.backup_path(n)
+            if not os.path.exists(path):
+                continue
+            try:
+                pomodoro_stats = yield from stream_json_data(path, tasks, chunk_size)
+            except (ValueError, UnicodeDecodeError) as e:
+                print(f"备份 {path} 无法使用: {e}")
+                del tasks[:]
+                continue
+            print(f"已从备份恢复数据: {path}")
+            self.recovered = True
+            return pomodoro_stats
+
+        if main_exists:
+            raise ValueError("数据文件及所有备份均无法读取")
+        return {}
+
+    def _write_snapshot(self, tasks, pomodoro_stats, states=None):
+        """原子写入：先写临时文件并 fsync，再轮换备份并改名替换
+
+        states 为 tasks 对应的 task_state 元组（已有时传入），用于生成二进制快照。
+        """
+        data = {
+            "tasks": tasks,
+            "pomodoro_stats": pomodoro_stats
+        }
+        tmp_file = self.data_file + '.tmp'
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+
+        # 滚动保留最近几份有效快照：bak1 最新
+        if SNAPSHOT_BACKUPS > 0 and os.path.exists(self.data_file):
+            for n in range(SNAPSHOT_BACKUPS - 1, 0, -1):
+                if os.path.exists(self.backup_path(n)):
+                    os.replace(self.backup_path(n), self.backup_path(n + 1))
+            os.replace(self.data_file, self.backup_path(1))
+        os.replace(tmp_file, self.data_file)
+        fsync_dir(self.data_file)
+        if self.binary_file:
+            self._write_binary(states if states is not None else task_states(tasks), pomodoro_stats)
+
+    def apply(self, records):
+        if not self.journal:
+            return False
+        try:
+            self.journal.append(records)
+        except Exception as e:
+            print(f"写入变更日志失败: {e}")
+            return False
+        return True
+
+    def needs_compaction(self):
+        return bool(self.journal) and self.journal.record_count >= JOURNAL_COMPACT_THRESHOLD
+
+    def compact(self, tasks, pomodoro_stats, wait=False):
+        """在后台线程中把变更日志合并回快照文件"""
+        if not self.journal:
+            return
+        if self.compaction_thread and self.compaction_thread.is_alive():
+            if not wait:
+                return
+            self.compaction_thread.join()
+        if not self.journal.rotate():
+            # 上次压缩中断遗留的旧段：其内容已包含在内存中，直接做完整保存
+            self.save_all([dict(t) for t in tasks], pomodoro_stats)
+            return
+
+        # 在调用线程中只复制各任务的字段值（不转换为字典），转换、序列化和写盘都在后台线程
+        states = list(map(task_state, tasks))
+        pomodoro_stats = dict(pomodoro_stats)
+        generation = self.snapshot_generation
+
+        def run():
+            try:
+                tasks = [Task(*state).to_dict() for state in states]
+                with self.snapshot_lock:
+                    if generation != self.snapshot_generation:
+                        # 期间已有完整保存，本次结果已过期
+                        return
+                    self._write_snapshot(tasks, pomodoro_stats, states)
+                    self.journal.finish_compaction()
+                print(f"变更日志已压缩: 任务 {len(tasks)} 条")
+            except Exception as e:
+                print(f"压缩变更日志失败: {e}")
+
+        self.compaction_thread = threading.Thread(target=run, daemon=True)
+        self.compaction_thread.start()
+        if wait:
+            self.compaction_thread.join()
+
+    def preserve(self, move=False):
+        if self.compaction_thread and self.compaction_thread.is_alive():
+            self.compaction_thread.join()
+        target = free_path(self.data_file + '.corrupt')
+        keep = os.replace if move else shutil.copy2
+        if os.path.exists(self.data_file):
+            keep(self.data_file, target)
+            print(f"已保留无法完整读取的数据文件: {target}")
+        if self.journal:
+            # 日志是相对主文件的增量，随主文件一起保留；移开后不会被重放到备份上
+            for path in (self.journal.compacting_path, self.journal.path):
+                if os.path.exists(path):
+                    keep(path, target + path[len(self.data_file):])
+            if move:
+                self.journal.record_count = 0
+        return move and any(os.path.exists(self.backup_path(n)) for n in range(1, SNAPSHOT_BACKUPS + 1))
+
+    def close(self):
+        """退出前等待后台压缩完成"""
+        if self.compaction_thread and self.compaction_thread.is_alive():
+            self.compaction_thread.join()
+
+
+class SqliteStorage(StorageBackend):
+    """SQLite 存储：每条任务一行，增删改只触及对应的行"""
+
+    incremental = True
+
+    SCHEMA = '''
+        CREATE TABLE IF NOT EXISTS tasks (
+            id TEXT PRIMARY KEY,
+            position INTEGER NOT NULL,
+            text TEXT NOT NULL DEFAULT '',
+            priority TEXT NOT NULL DEFAULT '不紧急不重要',
+            deadline TEXT NOT NULL DEFAULT '',
+            completed INTEGER NOT NULL DEFAULT 0,
+            extra TEXT,
+            deadline_ordinal INTEGER NOT NULL DEFAULT 0
+        );
+        CREATE INDEX IF NOT EXISTS idx_tasks_priority ON tasks(priority);
+        CREATE INDEX IF NOT EXISTS idx_tasks_deadline ON tasks(deadline_ordinal);
+        CREATE INDEX IF NOT EXISTS idx_tasks_position ON tasks(position);
+        CREATE INDEX IF NOT EXISTS idx_tasks_display ON tasks(completed, position, deadline_ordinal);
+        CREATE TABLE IF NOT EXISTS pomodoro_stats (
+            date TEXT PRIMARY KEY,
+            count INTEGER NOT NULL DEFAULT 0
+        );
+    '''
+
+    def __init__(self, db_file):
+        self.db_file = db_file
+        # 写入可能来自后台线程，由 lock 串行化访问
+        self.conn = sqlite3.connect(db_file, check_same_thread=False)
+        self._upgrade_schema()
+        self.conn.executescript(self.SCHEMA)
+        self.lock = threading.Lock()
+        self.next_position = 0
+
+    def _upgrade_schema(self):
+        """旧版数据库没有 deadline_ordinal 列：补上该列并按 deadline 计算，重建按日期的索引"""
+        columns = [row[1] for row in self.conn.execute('PRAGMA table_info(tasks)')]
+        if not columns or 'deadline_ordinal' in columns:
+            return
+        rows = self.conn.execute('SELECT id, deadline FROM tasks').fetchall()
+        with self.conn:
+            self.conn.execute('ALTER TABLE tasks ADD COLUMN deadline_ordinal INTEGER NOT NULL DEFAULT 0')
+            self.conn.executemany('UPDATE tasks SET deadline_ordinal = ? WHERE id = ?',
+                                  ((deadline_ordinal(deadline), task_id) for task_id, deadline in rows if deadline))
+            self.conn.execute('DROP INDEX IF EXISTS idx_tasks_deadline')
+            self.conn.execute('DROP INDEX IF EXISTS idx_tasks_display')
+        print(f"已升级SQLite数据库: 任务 {len(rows)} 条")
+
+    def iter_load(self, tasks, chunk_size):
+        with self.lock:
+            total = self.conn.execute('SELECT COUNT(*) FROM tasks').fetchone()[0]
+            stats = self.conn.execute('SELECT date, count FROM pomodoro_stats').fetchall()
+        cursor = self.conn.cursor()
+        last_position = -1
+        while True:
+            # 按 position 分段查询，每段之间释放锁
+            with self.lock:
+                rows = cursor.execute(
+                    'SELECT id, text, priority, deadline, completed, extra, position FROM tasks '
+                    'WHERE position > ? ORDER BY position LIMIT ?',
+                    (last_position, chunk_size)
+                ).fetchall()
+            if not rows:
+                break
+            tasks.extend(self._row_to_task(row) for row in rows)
+            last_position = rows[-1][6]
+            yield len(tasks) / total if total else 1.0
+        self.next_position = last_position + 1
+        print(f"加载SQLite数据，任务: {len(tasks)} 条，番茄记录: {len(stats)} 天")
+        return dict(stats)
+
+    def save_all(self, tasks, pomodoro_stats):
+        with self.lock, self.conn:
+            self.conn.execute('DELETE FROM tasks')
+            self.conn.executemany(
+                'INSERT INTO tasks (id, position, text, priority, deadline, completed, extra, deadline_ordinal) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                (self._task_to_row(task, pos) for pos, task in enumerate(tasks))
+            )
+            self.conn.execute('DELETE FROM pomodoro_stats')
+            self.conn.executemany('INSERT INTO pomodoro_stats (date, count) VALUES (?, ?)', pomodoro_stats.items())
+            self.next_position = len(tasks)
+
+    def apply(self, records):
+        with self.lock, self.conn:
+            for record in records:
+                op = record.get('op')
+                if op == 'add':
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO tasks (id, position, text, priority, deadline, completed, extra, deadline_ordinal) '
+                        'VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                        self._task_to_row(record['task'], self.next_position)
+                    )
+                    self.next_position += 1
+                elif op == 'update':
+                    self._update_row(record['id'], record.get('fields', {}))
+                elif op == 'delete':
+                    self.conn.execute('DELETE FROM tasks WHERE id = ?', (record['id'],))
+                elif op == 'pomodoro':
+                    self.conn.execute(
+                        'INSERT OR REPLACE INTO pomodoro_stats (date, count) VALUES (?, ?)',
+                        (record['date'], record.get('count', 0))
+                    )
+        return True
+
+    def _update_row(self, task_id, fields):
+        columns = {k: v for k, v in fields.items() if k in TASK_COLUMNS and k != 'id'}
+        extra = {k: v for k, v in fields.items() if k not in TASK_COLUMNS}
+        if 'completed' in columns:
+            columns['completed'] = 1 if columns['completed'] else 0
+        if 'deadline' in columns:
+            columns['deadline_ordinal'] = deadline_ordinal(columns['deadline'])
+        if extra:
+            row = self.conn.execute('SELECT extra FROM tasks WHERE id = ?', (task_id,)).fetchone()
+            merged = json.loads(row[0]) if row and row[0] else {}
+            merged.update(extra)
+            columns['extra'] = json.dumps(merged, ensure_ascii=False)
+        if columns:
+            assignments = ', '.join(f'{k} = ?' for k in columns)
+            self.conn.execute(f'UPDATE tasks SET {assignments} WHERE id = ?', (*columns.values(), task_id))
+
+    def fetch_display_ids(self, offset, limit):
+        """未完成任务按列表顺序在前，已完成任务按日期降序在后（与 OrderedTaskView 相同，
+        按日期序数排序，没有或无法解析日期的排在最后）"""
+        with self.lock:
+            rows = self.conn.execute(
+                '''SELECT id FROM tasks
+                   ORDER BY completed,
+                            CASE WHEN completed = 0 THEN position ELSE 0 END,
+                            deadline_ordinal DESC,
+                            position
+                   LIMIT ? OFFSET ?''',
+                (limit, offset)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def preserve(self, move=False):
+        target = free_path(self.db_file + '.corrupt')
+        with self.lock:
+            if move:
+                self.conn.close()
+                os.replace(self.db_file, target)
+                self.conn = sqlite3.connect(self.db_file, check_same_thread=False)
+                self.conn.executescript(self.SCHEMA)
+            else:
+                shutil.copy2(self.db_file, target)
+        print(f"已保留无法完整读取的数据文件: {target}")
+        return False
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+    @staticmethod
+    def _task_to_row(task, position):
+        extra = {k: v for k, v in task.items() if k not in TASK_COLUMNS}
+        deadline = task.get('deadline', '')
+        if not isinstance(deadline, str):
+            # 非字符串的截止日期（如 null）原样存入 extra，读取时覆盖 deadline 列
+            extra['deadline'] = deadline
+            deadline = ''
+        return (
+            task.get('id'),
+            position,
+            task.get('text', ''),
+            task.get('priority', '不紧急不重要'),
+            deadline,
+            1 if task.get('completed', False) else 0,
+            json.dumps(extra, ensure_ascii=False) if extra else None,
+            deadline_ordinal(deadline),
+        )
+
+    @staticmethod
+    def _row_to_task(row):
+        task_id, text, priority, deadline, completed, extra, _ = row
+        task = {
+            'id': task_id,
+            'text': text,
+            'priority': priority,
+            'deadline': deadline,
+            'completed': bool(completed)
+        }
+        if extra:
+            task.update(json.loads(extra))
+        return task
+
+
+def task_states(tasks):
+    """把任务（字典或 Task）按加载时的规则规范化，返回 task_state 元组列表，跳过无效条目"""
+    states = []
+    for item in tasks:
+        try:
+            states.append(task_state(task_from_data(item)))
+        except ValueError:
+            continue
+    return states
+
+
+def free_path(path):
+    """path 已存在时依次尝试 path2、path3……，返回第一个不存在的路径"""
+    candidate, n = path, 1
+    while os.path.exists(candidate):
+        n += 1
+        candidate = f"{path}{n}"
+    return candidate
+
+
+def fsync_dir(path):
+    """同步文件所在目录，确保改名操作落盘（Windows 不支持，忽略即可）"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def write_json_atomic(path, data):
+    """写临时文件并 fsync 后改名替换，避免留下写了一半的文件"""
+    tmp_file = path + '.tmp'
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_file, path)
+    fsync_dir(path)
+
+
+def stream_json_data(data_file, tasks, chunk_size):
+    """流式读取 JSON 数据文件（兼容旧版纯列表格式），逐块追加到 tasks 并产出进度，返回 pomodoro_stats"""
+    stream = JsonTaskStream(data_file)
+    for chunk in stream.iter_chunks(chunk_size):
+        tasks.extend(chunk)
+        yield stream.progress
+    if stream.legacy_format:
+        print(f"检测到旧版数据格式，加载任务: {len(tasks)} 条")
+    else:
+        print(f"加载新版数据格式，任务: {len(tasks)} 条，番茄记录: {len(stream.pomodoro_stats)} 天")
+    return stream.pomodoro_stats
+
+
+def drain(generator):
+    """执行完生成器并返回其返回值"""
+    while True:
+        try:
+            next(generator)
+        except StopIteration as stop:
+            return stop.value
+
+
+def migrate_json_to_sqlite(data_file, db_file):
+    """把 todo_data.json（含旧版列表格式和未压缩的变更日志）一次性导入 SQLite"""
+    tasks, pomodoro_stats = JsonStorage(data_file).load()
+    valid = []
+    for item in tasks:
+        try:
+            valid.append(task_from_data(item).to_dict())
+        except ValueError as e:
+            print(f"跳过{e}")
+    if len(valid) < len(tasks):
+        # 原 JSON 文件迁移后保持不变，跳过的条目仍保留在其中
+        print(f"迁移时跳过无效的任务数据: {len(tasks) - len(valid)} 条")
+        tasks = valid
+    # 先写入临时库再改名，避免迁移中断留下半个数据库
+    tmp_file = db_file + '.tmp'
+    if os.path.exists(tmp_file):
+        os.remove(tmp_file)
+    storage = SqliteStorage(tmp_file)
+    try:
+        storage.save_all(tasks, pomodoro_stats)
+    finally:
+        storage.close()
+    os.replace(tmp_file, db_file)
+    print(f"已迁移到SQLite: 任务 {len(tasks)} 条，番茄记录 {len(pomodoro_stats)} 天")
+    return len(tasks)
+
+
+def create_storage(backend, data_file):
+    """根据配置创建存储后端"""
+    if backend == 'sqlite':
+        db_file = os.path.splitext(data_file)[0] + '.db'
+        if not os.path.exists(db_file) and os.path.exists(data_file):
+            migrate_json_to_sqlite(data_file, db_file)
+        return SqliteStorage(db_file)
+    return JsonStorage(data_file)
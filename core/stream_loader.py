@@ -0,0 +1,140 @@
+import codecs
+import json
+import os
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = ' \t\n\r'
+
+
+class JsonTaskStream:
+    """流式读取 todo_data.json 中的任务
+
+    文件按块读取，任务数组中的元素逐个解码，不需要一次读入整个文件。
+    兼容旧版纯列表格式与 {"tasks": [...], "pomodoro_stats": {...}} 格式，
+    pomodoro_stats 在迭代结束后可用。
+    """
+
+    def __init__(self, path, block_size=1 << 16):
+        self.path = path
+        self.block_size = block_size
+        self.total_bytes = os.path.getsize(path)
+        self.bytes_read = 0
+        self.pomodoro_stats = {}
+        self.legacy_format = False
+        self._file = None
+        self._utf8 = codecs.getincrementaldecoder('utf-8')()
+        self._buf = ''
+        self._pos = 0
+        self._eof = False
+
+    @property
+    def progress(self):
+        return self.bytes_read / self.total_bytes if self.total_bytes else 1.0
+
+    def iter_chunks(self, chunk_size):
+        """按块产出任务列表"""
+        chunk = []
+        for task in self:
+            chunk.append(task)
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            self._file = f
+            try:
+                yield from self._iter_document()
+            finally:
+                self._file = None
+
+    def _iter_document(self):
+        ch = self._peek()
+        if ch is None:
+            return
+        if ch == '[':
+            self.legacy_format = True
+            yield from self._iter_array()
+        elif ch == '{':
+            self._pos += 1
+            if self._peek() == '}':
+                return
+            while True:
+                key = self._decode_value()
+                self._expect(':')
+                if key == 'tasks' and self._peek() == '[':
+                    yield from self._iter_array()
+                else:
+                    value = self._decode_value()
+                    if key == 'pomodoro_stats' and isinstance(value, dict):
+                        self.pomodoro_stats = value
+                if self._next_char() == '}':
+                    return
+        else:
+            raise ValueError(f"无法识别的数据格式: {ch!r}")
+
+    def _iter_array(self):
+        self._expect('[')
+        if self._peek() == ']':
+            self._pos += 1
+            return
+        while True:
+            yield self._decode_value()
+            if self._next_char() == ']':
+                return
+
+    # --- 缓冲区操作 ---
+
+    def _fill(self):
+        if self._eof:
+            return False
+        block = self._file.read(self.block_size)
+        self.bytes_read += len(block)
+        if not block:
+            self._eof = True
+            self._buf = self._buf[self._pos:] + self._utf8.decode(b'', final=True)
+        else:
+            self._buf = self._buf[self._pos:] + self._utf8.decode(block)
+        self._pos = 0
+        return True
+
+    def _peek(self):
+        """跳过空白并返回下一个字符（不消费），文件结束返回 None"""
+        while True:
+            while self._pos < len(self._buf) and self._buf[self._pos] in _WHITESPACE:
+                self._pos += 1
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return None
+
+    def _next_char(self):
+        ch = self._peek()
+        if ch is None:
+            raise ValueError("数据文件意外结束")
+        self._pos += 1
+        if ch not in ',]}':
+            raise ValueError(f"数据格式错误: 意外的字符 {ch!r}")
+        return ch
+
+    def _expect(self, expected):
+        ch = self._peek()
+        if ch != expected:
+            raise ValueError(f"数据格式错误: 需要 {expected!r}，实际为 {ch!r}")
+        self._pos += 1
+
+    def _decode_value(self):
+        self._peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self._buf, self._pos)
+                # 数字等值可能恰好在缓冲区末尾被截断，需要读到后续字符才能确定
+                if end < len(self._buf) or self._eof:
+                    self._pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+            self._fill()
@@ -0,0 +1,237 @@
+import uuid
+from datetime import date
+from enum import IntEnum
+from operator import attrgetter
+from .config import PRIORITY_VALUES
+
+
+class Priority(IntEnum):
+    """四象限优先级，取值与 PRIORITY_VALUES 一致"""
+    NOT_URGENT_NOT_IMPORTANT = 0
+    URGENT_NOT_IMPORTANT = 1
+    IMPORTANT_NOT_URGENT = 2
+    URGENT_IMPORTANT = 3
+
+    @property
+    def label(self):
+        return PRIORITY_LABELS[self]
+
+    @classmethod
+    def from_label(cls, label):
+        """按中文名称取优先级，兼容旧版“紧急/高/中/低”，未知值按最低处理"""
+        priority = PRIORITY_BY_LABEL.get(label)
+        if priority is None:
+            priority = PRIORITY_BY_LABEL.get(LEGACY_PRIORITIES.get(label), cls.NOT_URGENT_NOT_IMPORTANT)
+        return priority
+
+
+PRIORITY_BY_LABEL = {label: Priority(value) for label, value in PRIORITY_VALUES.items()}
+PRIORITY_LABELS = {priority: label for label, priority in PRIORITY_BY_LABEL.items()}
+LEGACY_PRIORITIES = {
+    "紧急": "紧急重要",
+    "高": "重要不紧急",
+    "中": "紧急不重要",
+    "低": "不紧急不重要"
+}
+
+
+def deadline_ordinal(deadline):
+    """把 'yyyy-MM-dd' 转为日期序数，无法解析时返回 0"""
+    try:
+        return date.fromisoformat(deadline).toordinal()
+    except (TypeError, ValueError):
+        return 0
+
+
+def is_iso_date(deadline):
+    """能解析的截止日期是否为规范的 'yyyy-MM-dd' 写法（不是 '20240501' 之类）"""
+    return len(deadline) == 10 and deadline[4] == deadline[7] == '-'
+
+
+def deadline_string(ordinal):
+    return date.fromordinal(ordinal).isoformat() if ordinal else ''
+
+
+def task_key(task_id):
+    """把外部使用的字符串 id 转为内部键：规范写法的 UUID（小写、带连字符）转为 128 位整数，
+    其他格式（包括大写、带花括号等非规范写法的 UUID）保持原样，保存时原样写回"""
+    if isinstance(task_id, int):
+        return task_id
+    if not (isinstance(task_id, str) and len(task_id) == 36 and task_id == task_id.lower()
+            and task_id[8] == task_id[13] == task_id[18] == task_id[23] == '-'):
+        return task_id
+    try:
+        return uuid.UUID(task_id).int
+    except ValueError:
+        return task_id
+
+
+def normalize_tags(tags):
+    """把标签整理为去重的元组：可传入字符串（空白、逗号分隔，可带 #）或字符串列表"""
+    if not tags:
+        return ()
+    if isinstance(tags, str):
+        tags = tags.replace('，', ',').replace(',', ' ').split()
+    result = []
+    for tag in tags:
+        tag = str(tag).strip().lstrip('#')
+        if tag and tag not in result:
+            result.append(tag)
+    return tuple(result)
+
+
+class Task:
+    """紧凑的任务记录
+
+    id 以 128 位整数保存（非规范写法的 id 保持字符串），优先级为 Priority 枚举，
+    截止日期为日期序数（无法解析或写法不规范的原文另存于 extra，保存时原样写回），标签为字符串元组，
+    排序键都是整数比较。同时提供与原任务字典相同的读写方式
+    （task['text']、task.get('completed')、dict(task) 等），序列化格式不变。
+    """
+
+    __slots__ = ('uid', 'text', 'priority', 'deadline_ordinal', 'completed', 'tags', 'extra')
+
+    FIELDS = ('id', 'text', 'priority', 'deadline', 'completed', 'tags')
+
+    def __init__(self, uid, text='', priority=Priority.NOT_URGENT_NOT_IMPORTANT, deadline_ordinal=0,
+                 completed=False, extra=None, tags=()):
+        self.uid = uid
+        self.text = text
+        self.priority = priority
+        self.deadline_ordinal = deadline_ordinal
+        self.completed = completed
+        self.tags = tags
+        self.extra = extra  # 其他字段，没有时为 None
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, Task):
+            return data
+        extra = {k: v for k, v in data.items() if k not in cls.FIELDS}
+        deadline = data.get('deadline', '')
+        ordinal = deadline_ordinal(deadline)
+        if deadline != '' and not (ordinal and is_iso_date(deadline)):
+            # 无法解析或写法不规范的截止日期原样保留（to_dict 时写回），序数只用于排序和筛选
+            extra['deadline'] = deadline
+        return cls(
+            task_key(data.get('id') or str(uuid.uuid4())),
+            data.get('text', ''),
+            Priority.from_label(data.get('priority')),
+            ordinal,
+            bool(data.get('completed', False)),
+            extra or None,
+            normalize_tags(data.get('tags')),
+        )
+
+    def to_dict(self):
+        data = {
+            'id': self.id,
+            'text': self.text,
+            'priority': self.priority.label,
+            'deadline': self.deadline,
+            'completed': self.completed
+        }
+        if self.tags:
+            data['tags'] = list(self.tags)
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    @property
+    def id(self):
+        return str(uuid.UUID(int=self.uid)) if isinstance(self.uid, int) else self.uid
+
+    @property
+    def deadline(self):
+        return deadline_string(self.deadline_ordinal)
+
+    def deadline_date(self):
+        return date.fromordinal(self.deadline_ordinal) if self.deadline_ordinal else None
+
+    # --- 与任务字典兼容的接口 ---
+
+    def __getitem__(self, key):
+        if key == 'id':
+            return self.id
+        if key == 'text':
+            return self.text
+        if key == 'priority':
+            return self.priority.label
+        if key == 'deadline':
+            if self.extra and 'deadline' in self.extra:
+                return self.extra['deadline']
+            return self.deadline
+        if key == 'completed':
+            return self.completed
+        if key == 'tags':
+            return list(self.tags)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key == 'id':
+            self.uid = task_key(value)
+        elif key == 'text':
+            self.text = value
+        elif key == 'priority':
+            self.priority = Priority.from_label(value)
+        elif key == 'deadline':
+            self.deadline_ordinal = deadline_ordinal(value)
+            if value != '' and not (self.deadline_ordinal and is_iso_date(value)):
+                self.extra = dict(self.extra or {}, deadline=value)
+            elif self.extra and 'deadline' in self.extra:
+                del self.extra['deadline']
+        elif key == 'completed':
+            self.completed = bool(value)
+        elif key == 'tags':
+            self.tags = normalize_tags(value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return key in self.FIELDS or bool(self.extra and key in self.extra)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def update(self, fields):
+        for key, value in fields.items():
+            self[key] = value
+
+    def keys(self):
+        # 与 to_dict 一致：没有标签时不输出 tags；原样保留的截止日期已在 FIELDS 中
+        keys = list(self.FIELDS if self.tags else self.FIELDS[:-1])
+        return keys + ([k for k in self.extra if k not in self.FIELDS] if self.extra else [])
+
+    def items(self):
+        return self.to_dict().items()
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+
+# 与 Task.__init__ 参数顺序一致的字段值元组：task_state(task) 在 C 层一次取出全部字段，
+# 需要在其他线程序列化时用它代替 to_dict() 做快照，Task(*state) 还原
+task_state = attrgetter('uid', 'text', 'priority', 'deadline_ordinal', 'completed', 'extra', 'tags')
+
+
+def task_from_data(item):
+    """把从文件读到的条目转为 Task，条目无效（如 null、id 或文本类型错误）时抛出 ValueError"""
+    if isinstance(item, Task):
+        return item
+    try:
+        if not isinstance(item, dict):
+            raise TypeError(type(item).__name__)
+        task = Task.from_dict(item)
+        hash(task.uid)
+        if not isinstance(task.text, str):
+            raise TypeError('text')
+    except Exception as e:
+        raise ValueError(f"无效的任务数据: {str(item)[:40]} ({e})") from None
+    return task
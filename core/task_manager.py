@@ -1,115 +1,645 @@
-import json
 import os
-from PyQt6.QtCore import Qt, QDateTime
-from .config import DATA_FILE, PRIORITY_VALUES
+import time
+import uuid
+from datetime import date
+from PyQt6.QtCore import Qt
+from .config import (DATA_FILE, PRIORITY_VALUES, STORAGE_BACKEND, WRITE_BEHIND_ENABLED, WRITE_LATENCY_MS,
+                     ARCHIVE_AFTER_DAYS, ARCHIVE_SEARCH_LIMIT, LOAD_CHUNK_SIZE,
+                     SEARCH_INDEX_SLICE_MS)
+from .storage import create_storage, drain
+from .writer import WriteBehindWriter
+from .ordered_view import OrderedTaskView
+from .task import Task, LEGACY_PRIORITIES, task_key, normalize_tags, task_from_data, deadline_ordinal
+from .archive import TaskArchive
+from .search_index import NgramIndex
+from .query import parse_query
+from .deadline_index import DeadlineIndex
+from .counters import TaskCounters
+from .bitmap_index import BitmapIndex
+
+def archive_ordinal(task):
+    """归档依据的日期序数：截止日期，没有时用完成日期，都没有时为 0"""
+    return task.deadline_ordinal or deadline_ordinal(task.get('completed_date'))
+
+
+def bisect_by_key(items, value, key, right=False):
+    """在按 key 排好序的 items 中二分查找 value 的插入位置（bisect_left / bisect_right）"""
+    low, high = 0, len(items)
+    while low < high:
+        mid = (low + high) // 2
+        current = key(items[mid])
+        if current < value or (right and current == value):
+            low = mid + 1
+        else:
+            high = mid
+    return low
+
 
 class TaskManager:
-    def __init__(self, data_file=DATA_FILE):
+    def __init__(self, data_file=DATA_FILE, storage=None, write_behind=WRITE_BEHIND_ENABLED):
         self.data_file = data_file
-        self.tasks = []
         self.pomodoro_stats = {}
+        # 存储后端：内存中保留完整列表，后端负责持久化单条变更
+        self.storage = storage if storage is not None else create_storage(STORAGE_BACKEND, data_file)
+        # 后台写线程：GUI 操作只入队，不等待磁盘
+        self.writer = WriteBehindWriter(self.storage, WRITE_LATENCY_MS) if write_behind else None
+        # id -> task，所有按 id 的查找都走这里；字典保持插入顺序，即任务列表的顺序（保存顺序），
+        # 是任务集合的唯一来源，删除任务只需 O(1) 删除键
+        self._index = {}
+        self.bitmaps = BitmapIndex()  # 标签、优先级、完成状态的位图，过滤查询用位运算求交
+        self.deadlines = DeadlineIndex()  # 按截止日期排序，回答过期/即将到期的区间查询和计数
+        self.counters = TaskCounters()  # 各象限未完成数、今天完成数，供标题栏显示
+        self.view = OrderedTaskView()  # 增量维护的显示顺序
+        # 冷归档：较早的已完成任务不再常驻内存，翻页或搜索历史时按需读取
+        # 关闭自动归档时仍读取已有的归档
+        self.archive = TaskArchive(os.path.splitext(data_file)[0] + '_archive')
+        self.search_index = None  # 文本搜索索引，加载完成后分块建立，之后随增删改增量维护
+        self._search_builder = None  # 正在分块建立索引的生成器
+        self.search_query = ''  # 当前搜索/过滤文本，非空时分页只返回匹配的任务
+        self._query = None  # search_query 解析得到的 TaskQuery
+        self._search_results = None  # 当前查询的结果，任务增删改时按排序键增量调整
+        self._result_key = None  # _search_results 的排序键
+        self._archive_results = []  # 当前查询在归档中的结果，显示在内存任务的结果之后
+        self.loading = False  # 流式加载进行中
+        self.load_progress = 1.0
         # Sort order state
         self.sort_order = {'priority': Qt.SortOrder.AscendingOrder, 'deadline': Qt.SortOrder.AscendingOrder}
 
+    @property
+    def tasks(self):
+        """按列表顺序的全部任务（新列表）"""
+        return list(self._index.values())
+
     def load_tasks(self):
         """加载任务"""
-        try:
-            if os.path.exists(self.data_file):
-                with open(self.data_file, 'r', encoding='utf-8') as f:
-                    content_str = f.read().strip()
-                    if content_str:
-                        content = json.loads(content_str)
-                        
-                        # 兼容性处理：判断是旧的列表格式还是新的字典格式
-                        if isinstance(content, list):
-                            self.tasks = content
-                            self.pomodoro_stats = {}
-                            print(f"检测到旧版数据格式，加载任务: {len(self.tasks)} 条")
-                        elif isinstance(content, dict):
-                            self.tasks = content.get('tasks', [])
-                            self.pomodoro_stats = content.get('pomodoro_stats', {})
-                            print(f"加载新版数据格式，任务: {len(self.tasks)} 条，番茄记录: {len(self.pomodoro_stats)} 天")
-                        else:
-                            self.tasks = []
-                            self.pomodoro_stats = {}
-                        
-                        # 处理旧版本优先级值
-                        old_to_new = {
-                            "紧急": "紧急重要",
-                            "高": "重要不紧急",
-                            "中": "紧急不重要",
-                            "低": "不紧急不重要"
-                        }
-                        
-                        updated = False
-                        for task in self.tasks:
-                            if 'priority' in task and task['priority'] not in PRIORITY_VALUES:
-                                old_priority = task['priority']
-                                task['priority'] = old_to_new.get(old_priority, "不紧急不重要")
-                                print(f"更新任务优先级: {old_priority} -> {task['priority']}")
-                                updated = True
-                        
-                        if updated:
-                            self.save_tasks()
-                    else:
-                        self.tasks = []
-                        self.pomodoro_stats = {}
-            else:
-                self.tasks = []
-                self.pomodoro_stats = {}
-        except Exception as e:
-            print(f"加载任务失败: {e}")
-            self.tasks = []
+        drain(self.iter_load_tasks())
+        return self.tasks
+
+    def iter_load_tasks(self, chunk_size=LOAD_CHUNK_SIZE):
+        """分块加载任务的生成器，每加载一块产出一次进度（0~1）
+
+        第一块加载完后即可显示第一页，全部加载完成后再重建索引和归档。
+        """
+        self.loading = True
+        self.load_progress = 0.0
+        for attempt in range(2):
             self.pomodoro_stats = {}
-            # 创建新的数据文件
+            self._rebuild_indexes([])
+            try:
+                yield from self._iter_load_storage(chunk_size)
+                break
+            except Exception as e:
+                print(f"加载任务失败: {e}")
+                self.pomodoro_stats = {}
+                self._rebuild_indexes([])
+                # 不能用空列表覆盖读不出来的数据：先把数据文件移开保留，再尝试从备份加载一次
+                if attempt or not self.storage.preserve(move=True):
+                    break
+        if ARCHIVE_AFTER_DAYS is not None:
+            self.archive_completed(ARCHIVE_AFTER_DAYS)
+        self.loading = False
+        self.load_progress = 1.0
+
+    def _iter_load_storage(self, chunk_size):
+        updated = False
+        skipped = 0
+        seen = set()
+        tasks = []  # 后端按块追加到这个列表（日志重放也在其上进行），全部读完后才成为任务集合
+        loader = self.storage.iter_load(tasks, chunk_size)
+        while True:
+            start = len(tasks)
+            try:
+                self.load_progress = next(loader)
+            except StopIteration as stop:
+                self.pomodoro_stats = stop.value or {}
+                break
+            updated = self._normalize_tasks(tasks[start:]) or updated
+            chunk, renamed = self._convert_tasks(tasks[start:], seen)
+            skipped += len(tasks) - start - len(chunk)
+            updated = updated or renamed
+            tasks[start:] = chunk
+            if start == 0:
+                # 第一块：先建立索引，界面可以立即显示第一页
+                self._rebuild_indexes(tasks)
+            yield self.load_progress
+        # 重放日志可能带入新的字典记录，同样检查并转换
+        pending = [t for t in tasks if not isinstance(t, Task)]
+        if pending:
+            updated = self._normalize_tasks(pending) or updated
+            converted, renamed = self._convert_tasks(tasks, set())
+            skipped += len(tasks) - len(converted)
+            updated = updated or renamed
+            tasks = converted
+        self._rebuild_indexes(tasks)
+        if skipped:
+            # 跳过的条目不会再写回，先保留原文件的副本
+            print(f"跳过无法读取的任务: {skipped} 条")
+            self.storage.preserve()
+            updated = True
+        if updated:
             self.save_tasks()
-        return self.tasks
+
+    def _convert_tasks(self, items, seen):
+        """把加载得到的条目转为 Task；无效的条目（如 null、字段类型错误）被跳过，
+        id 与 seen 中已有的重复时分配新 id。返回 (任务列表, 是否分配过新 id)"""
+        result = []
+        renamed = False
+        for item in items:
+            try:
+                task = task_from_data(item)
+            except ValueError as e:
+                print(f"跳过{e}")
+                continue
+            if task.uid in seen:
+                # 任务集合以 id 为键，重复的 id 会让其中一条丢失
+                old_id = task.id
+                task.uid = task_key(str(uuid.uuid4()))
+                print(f"任务 id 重复，已重新分配: {old_id} -> {task.id}")
+                renamed = True
+            seen.add(task.uid)
+            result.append(task)
+        return result, renamed
+
+    def _normalize_tasks(self, tasks):
+        """补齐缺失的 id 并转换旧版本优先级值（作用于加载得到的字典），有修改时返回 True"""
+        updated = False
+        for task in tasks:
+            if not isinstance(task, dict):
+                continue  # 二进制快照直接产出 Task，已是规范化的数据；无效条目稍后跳过
+            # 旧数据可能缺少 id，补齐后才能建立索引
+            if not task.get('id'):
+                task['id'] = str(uuid.uuid4())
+                updated = True
+            if 'priority' in task and task['priority'] not in PRIORITY_VALUES:
+                old_priority = task['priority']
+                task['priority'] = LEGACY_PRIORITIES.get(old_priority, "不紧急不重要")
+                print(f"更新任务优先级: {old_priority} -> {task['priority']}")
+                updated = True
+        return updated
+
+    def _rebuild_indexes(self, tasks=None):
+        """按 tasks（默认为当前任务）重建全部索引"""
+        if tasks is not None:
+            self._index = {t.uid: t for t in tasks}
+        tasks = self.tasks
+        self.bitmaps.rebuild(tasks)
+        self.deadlines.rebuild(tasks)
+        self.counters.rebuild(tasks)
+        self.view.rebuild(tasks)
+        self.search_index = None
+        self._search_builder = None
+        self._search_results = None
 
     def save_tasks(self):
-        """保存任务到文件"""
+        """保存全部任务（完整快照）"""
+        if self.writer:
+            self.writer.submit_snapshot([t.to_dict() for t in self._index.values()], dict(self.pomodoro_stats))
+            return
         try:
-            data = {
-                "tasks": self.tasks,
-                "pomodoro_stats": self.pomodoro_stats
-            }
-            with open(self.data_file, 'w', encoding='utf-8') as f:
-                json.dump(data, f, ensure_ascii=False, indent=2)
-            print(f"成功保存数据: 任务 {len(self.tasks)} 条")
+            self.storage.save_all([t.to_dict() for t in self._index.values()], self.pomodoro_stats)
+            print(f"成功保存数据: 任务 {len(self._index)} 条")
         except Exception as e:
             print(f"保存任务失败: {e}")
 
+    def _record(self, *records):
+        """持久化变更记录（多条时一次写入），后端不支持增量写入时回退为完整保存"""
+        if not self.storage.incremental:
+            self.save_tasks()
+            return
+        if self.writer:
+            for record in records:
+                self.writer.submit(record)
+        else:
+            try:
+                if not self.storage.apply(list(records)):
+                    self.save_tasks()
+                    return
+            except Exception as e:
+                print(f"保存变更失败: {e}")
+                self.save_tasks()
+                return
+        if self.storage.needs_compaction():
+            self.storage.compact(self.tasks, self.pomodoro_stats)
+
+    @property
+    def version(self):
+        """已提交的修改版本号"""
+        return self.writer.version if self.writer else 0
+
+    @property
+    def durable_version(self):
+        """最近一次已落盘的修改版本号"""
+        return self.writer.durable_version if self.writer else 0
+
+    def flush(self, timeout=None):
+        """等待所有修改落盘"""
+        return self.writer.flush(timeout) if self.writer else True
+
+    def close(self):
+        """退出前刷新未落盘的修改并关闭存储"""
+        if self.writer:
+            self.writer.close()
+            if self.writer.is_dirty():
+                self._save_unwritten()
+            print(f"数据已落盘，版本: {self.writer.durable_version}/{self.writer.version}")
+        if self.storage.needs_compaction():
+            self.storage.compact(self.tasks, self.pomodoro_stats, wait=True)
+        self.storage.close()
+
+    def _save_unwritten(self):
+        """后台写线程退出前最后一次写入失败：改为同步保存完整数据，仍失败时明确报告未落盘的修改"""
+        writer = self.writer
+        print(f"后台写入未完成（已落盘版本 {writer.durable_version}/{writer.version}），改为同步保存")
+        try:
+            self.storage.save_all([t.to_dict() for t in self._index.values()], dict(self.pomodoro_stats))
+        except Exception as e:
+            print(f"保存失败，{writer.version - writer.durable_version} 次修改未能写入磁盘: {e}")
+            return
+        writer.durable_version = writer.version
+
+    def archive_completed(self, days):
+        """把 days 天前的已完成任务移入归档：按截止日期，没有截止日期时按完成日期，两者都没有的不归档"""
+        cutoff = date.today().toordinal() - days
+        old_tasks = [t for t in self.view.completed if 0 < archive_ordinal(t) < cutoff]
+        if not old_tasks:
+            return 0
+        try:
+            # 先确保归档落盘，再从主数据中删除
+            self.archive.add(old_tasks)
+        except Exception as e:
+            print(f"归档已完成任务失败: {e}")
+            return 0
+        old_uids = {t.uid for t in old_tasks}
+        self._rebuild_indexes([t for t in self.tasks if t.uid not in old_uids])
+        self._record(*({'op': 'delete', 'id': task.id} for task in old_tasks))
+        print(f"已归档已完成任务: {len(old_tasks)} 条")
+        return len(old_tasks)
+
+    def search_history(self, query, limit=ARCHIVE_SEARCH_LIMIT):
+        """在归档中搜索满足 query（TaskQuery 或查询文本）的历史任务，按显示顺序"""
+        if not self.archive:
+            return []
+        if isinstance(query, str):
+            query = parse_query(query)
+        if query.completed is False:
+            return []  # 归档中只有已完成任务
+        return self.archive.search(lambda task: self._matches(task, query), limit)
+
     def get_pomodoro_stats(self):
         return self.pomodoro_stats
 
     def update_pomodoro_stats(self, date_str, count):
         self.pomodoro_stats[date_str] = count
-        self.save_tasks()
+        self._record({'op': 'pomodoro', 'date': date_str, 'count': count})
 
     def add_task(self, task):
-        self.tasks.append(task)
-        self.save_tasks()
+        """添加任务（可传入任务字典），返回 Task"""
+        task = Task.from_dict(task)
+        self._index[task.uid] = task
+        self.view.insert(task)
+        self.bitmaps.add(task)
+        self.deadlines.add(task)
+        self.counters.add(task)
+        if self.search_index is not None:
+            self.search_index.add(task)
+        self._place_result(task)
+        self._record({'op': 'add', 'task': task.to_dict()})
+        return task
+
+    def get(self, task_id):
+        """按 id 查找任务，不存在时返回 None"""
+        return self._index.get(task_key(task_id))
+
+    def is_archived(self, task):
+        """任务是否来自冷归档（不在内存列表中，只读）"""
+        return task.uid not in self._index
+
+    def update(self, task_id, **fields):
+        """修改任务的部分字段，只记录变化的字段；有变化时返回 True"""
+        task = self.get(task_id)
+        if task is None:
+            return False
+        if 'tags' in fields:
+            fields['tags'] = list(normalize_tags(fields['tags']))
+        changed = {k: v for k, v in fields.items() if task.get(k) != v}
+        if not changed:
+            return False
+        if changed.get('completed'):
+            # 记录完成日期，用于统计今天完成的任务
+            changed['completed_date'] = date.today().isoformat()
+        self._forget_result(task)
+        # 影响显示位置的字段变化时，先移出视图再按新值插回
+        reorder = 'completed' in changed or 'deadline' in changed
+        if reorder:
+            self.view.discard(task)
+            self.deadlines.discard(task)
+        reindex = 'text' in changed and self.search_index is not None
+        if reindex:
+            self.search_index.remove(task)
+        self.bitmaps.discard(task)
+        self.counters.discard(task)
+        task.update(changed)
+        self.bitmaps.add(task)
+        self.counters.add(task)
+        if reorder:
+            self.view.insert(task)
+            self.deadlines.add(task)
+        if reindex:
+            self.search_index.add(task)
+        self._place_result(task)
+        self._record({'op': 'update', 'id': task.id, 'fields': changed})
+        return True
+
+    def remove(self, task_id):
+        """按 id 删除任务，返回被删除的任务"""
+        task = self._index.get(task_key(task_id))
+        if task is None:
+            # 可能是翻页时读取到的归档任务
+            self._search_results = None
+            return self.archive.remove(task_id) if self.archive else None
+        self._forget_result(task)
+        del self._index[task.uid]
+        self.view.discard(task, forget=True)
+        self.bitmaps.discard(task)
+        self.deadlines.discard(task)
+        self.counters.discard(task)
+        if self.search_index is not None:
+            self.search_index.remove(task)
+        self._record({'op': 'delete', 'id': task.id})
+        return task
+
+    def restore(self, task_id):
+        """把归档任务移回内存列表（取消完成前调用），返回该任务；不在归档中时返回 None"""
+        task = self.archive.remove(task_id)
+        if task is None:
+            return None
+        self.add_task(task)
+        # 归档已改写，尽快让主数据也落盘，避免两边都没有这条任务
+        self.flush()
+        self._search_results = None
+        return task
 
     def delete_task(self, task):
-        if task in self.tasks:
-            self.tasks.remove(task)
-            self.save_tasks()
+        self.remove(task.get('id'))
 
-    def get_tasks_for_display(self):
-        """获取用于显示的任务列表（处理排序和完成状态）"""
-        incomplete_tasks = [t for t in self.tasks if not t.get('completed', False)]
-        completed_tasks = [t for t in self.tasks if t.get('completed', False)]
+    def get_display_page(self, offset, limit):
+        """按显示顺序返回一页任务，已完成任务之后接着显示归档任务；搜索时返回一页搜索结果"""
+        if self.search_query:
+            results = self._get_search_results()
+            page = results[offset:offset + limit]
+            if len(page) < limit:
+                start = max(0, offset - len(results))
+                page += self._archive_results[start:start + limit - len(page)]
+            return page
+        live_dated = len(self.view) - self.view.undated_count()
+        archive_count = self.archive.count()
+        if offset + limit <= live_dated or not archive_count:
+            return self._get_live_page(offset, limit)
+        # 已完成任务整体按日期降序：内存中有日期的、归档中有日期的，
+        # 之后才是没有日期的（内存中的在前，归档的没有日期分段在最后）
+        archive_dated = archive_count - self.archive.undated_count()
+        parts = ((self._get_live_page, 0, live_dated),
+                 (self.archive.page, 0, archive_dated),
+                 (self._get_live_page, live_dated, len(self.view) - live_dated),
+                 (self.archive.page, archive_dated, archive_count - archive_dated))
+        page = []
+        for fetch, start, size in parts:
+            if offset < size and len(page) < limit:
+                page += fetch(start + offset, min(limit - len(page), size - offset))
+            offset = max(0, offset - size)
+        return page
 
-        # 完成任务始终按日期降序
-        try:
-            completed_tasks.sort(
-                key=lambda x: x.get('deadline', ''),
-                reverse=True
-            )
-        except Exception as e:
-            print(f"完成任务排序失败: {e}")
+    def _get_live_page(self, offset, limit):
+        """内存中任务的一页；后端支持时由后端直接分页查询"""
+        # 后台还有未落盘的修改时，后端的结果可能过期，直接使用内存数据
+        dirty = self.writer is not None and self.writer.is_dirty()
+        ids = None if dirty else self.storage.fetch_display_ids(offset, limit)
+        if ids is None:
+            return self.view.page(offset, limit)
+        tasks = (self._index.get(task_key(i)) for i in ids)
+        return [t for t in tasks if t is not None]
+
+    def count(self):
+        """参与显示的任务总数（含归档）；搜索时为匹配的任务数"""
+        if self.search_query:
+            return len(self._get_search_results()) + len(self._archive_results)
+        return len(self.view) + (self.archive.count() if self.archive else 0)
+
+    def set_search(self, text):
+        """设置搜索/过滤文本（见 core.query.parse_query），空字符串表示取消；有变化时返回 True
+
+        文本只在这里解析一次，无法解析时抛出 QueryError 并保持原来的查询。
+        """
+        text = (text or '').strip()
+        if text == self.search_query:
+            return False
+        query = parse_query(text) if text else None
+        self.search_query = text
+        self._query = None if query is None or query.is_empty() else query
+        self._search_results = None
+        return True
+
+    def iter_build_search_index(self, slice_ms=SEARCH_INDEX_SLICE_MS):
+        """分片建立搜索索引的生成器，每片最多用 slice_ms 毫秒，之后产出一次（加载完成后在空闲时驱动）
+
+        建立期间的增删改直接作用于索引；未建完时搜索会先同步建完剩余部分。
+        """
+        if self._search_builder is None:
+            if self.search_index is not None and self.search_index.ready:
+                return iter(())
+            self.search_index = NgramIndex()
+            self._search_builder = self._build_search_index(self.search_index, self.tasks, slice_ms / 1000)
+        return self._search_builder
+
+    def _build_search_index(self, index, tasks, budget):
+        end = time.perf_counter() + budget
+        for start in range(0, len(tasks), 64):
+            for task in tasks[start:start + 64]:
+                # 已删除的跳过；建立期间修改过文本的已由 update 加入
+                if task.uid not in index and task.uid in self._index:
+                    index.add(task)
+            if time.perf_counter() >= end:
+                yield
+                if self.search_index is not index:
+                    return  # 期间任务列表已整体重建
+                end = time.perf_counter() + budget
+        index.ready = True
+        self._search_builder = None
+
+    def run_query(self, query):
+        """执行 TaskQuery：标签、优先级、完成状态用位图求交，文本和较窄的截止日期区间
+        由各自的索引给出 uid 集合，其余条件只检查候选
+
+        有文本搜索词时按相关度排序，否则保持显示顺序。
+        """
+        candidates = []  # 索引给出的候选 uid 集合
+        if query.terms:
+            drain(self.iter_build_search_index())
+            candidates.append(self.search_index.match(self.search_index.terms(' '.join(query.terms))))
+        checks = []  # 需要逐条检查的条件
+        by_deadline = False
+        if query.has_deadline():
+            low, high = max(query.deadline_min or 1, 1), query.deadline_max
+            # 区间较窄时用截止日期索引取候选（按完成状态分区，同时满足 done 条件），
+            # 区间覆盖大部分任务时逐条比较序数更快
+            if self.deadlines.count(low, high, query.completed) * 8 <= len(self.view):
+                candidates.append(set(self.deadlines.range(low, high, query.completed)))
+                by_deadline = True
+            else:
+                checks.append(lambda t: t.deadline_ordinal >= low and (high is None or t.deadline_ordinal <= high))
+
+        if query.priorities is not None or query.has_tags():
+            bits = self._query_bitmap(query)
+            size = bin(bits).count('1')
+            for uids in sorted(candidates, key=len):
+                if len(uids) <= size:
+                    # 候选比位图结果少：转为位图求交
+                    bits &= self.bitmaps.from_uids(uids)
+                    size = bin(bits).count('1')
+                else:
+                    # 候选很多（如宽泛的文本搜索）：解码位图后再按集合筛选更快
+                    checks.append(lambda t, uids=uids: t.uid in uids)
+            tasks = self.bitmaps.tasks_of(bits)
+            indexed = True
+        elif candidates:
+            candidates.sort(key=len)
+            uids = candidates[0].intersection(*candidates[1:])
+            tasks = [self._index[uid] for uid in uids]
+            if query.completed is not None and not by_deadline:
+                checks.insert(0, lambda t: t.completed == query.completed)
+            indexed = True
+        elif query.completed is not None:
+            # 完成状态对应视图的一个分区，已是显示顺序
+            tasks = self.view.completed if query.completed else self.view.incomplete
+            indexed = False
+        else:
+            tasks = self.view.all()
+            indexed = False
+        for check in checks:
+            tasks = [t for t in tasks if check(t)]
+
+        if query.terms:
+            return self._rank(tasks, query.terms)
+        if indexed:
+            return self.view.ordered(tasks)
+        return list(tasks)
+
+    def _query_bitmap(self, query):
+        """标签（组内 OR、组间 AND、排除的标签 NOT）、优先级和完成状态条件的位图"""
+        bitmaps = self.bitmaps
+        bits = bitmaps.bitmap('all')
+        if query.priorities is not None:
+            bits &= bitmaps.any_of(('priority', p) for p in query.priorities)
+        for group in query.tag_groups:
+            bits &= bitmaps.any_of(('tag', tag) for tag in group)
+        if query.tags_excluded:
+            bits &= ~bitmaps.any_of(('tag', tag) for tag in query.tags_excluded)
+        if query.completed is not None:
+            completed = bitmaps.bitmap('completed')
+            bits &= completed if query.completed else ~completed
+        return bits
+
+    def all_tags(self):
+        """所有标签及使用它的任务数，按任务数降序"""
+        return self.bitmaps.tag_counts.most_common()
 
-        # 未完成任务按列表顺序（已在sort_by_*中处理）
-        return incomplete_tasks + completed_tasks
+    def tasks_due(self, start=None, end=None, completed=None):
+        """截止日期在 [start, end]（日期序数，None 表示不限）内的任务，按截止日期升序"""
+        return [self._index[uid] for uid in self.deadlines.range(start, end, completed)]
+
+    def count_due(self, start=None, end=None, completed=None):
+        """截止日期在 [start, end] 内的任务数，不遍历任务"""
+        return self.deadlines.count(start, end, completed)
+
+    def count_overdue(self, today=None):
+        """已过期（截止日期早于今天）的未完成任务数"""
+        today = (today or date.today()).toordinal()
+        return self.deadlines.count(1, today - 1, completed=False)
+
+    def count_due_within(self, days, today=None):
+        """今天起 days 天内（含今天）到期的未完成任务数"""
+        today = (today or date.today()).toordinal()
+        return self.deadlines.count(today, today + days - 1, completed=False)
+
+    def quadrant_counts(self):
+        """各象限（优先级）的未完成任务数"""
+        return dict(self.counters.open_by_priority)
+
+    def count_completed_today(self):
+        return self.counters.count_completed_today()
+
+    def _rank_key(self, terms):
+        """相关度排序键：未完成在前，查询词出现得越靠前、文本越短、截止日期越早越靠前
+
+        几项合成一个整数，比较比元组快得多；超长文本（数万字）只影响同组内的先后。
+        """
+        texts, first = self.search_index.texts, self.search_index.normalize(terms[0])
+
+        def rank(task):
+            text = texts[task.uid]
+            return ((task.completed * 65536 + text.find(first)) * 65536 + len(text)) * 4194304 + task.deadline_ordinal
+
+        return rank
+
+    def _rank(self, tasks, terms):
+        return sorted(tasks, key=self._rank_key(terms))
+
+    def _get_search_results(self):
+        if self._search_results is None:
+            query = self._query
+            self._search_results = self.run_query(query) if query else self.view.all()
+            self._result_key = self._rank_key(query.terms) if query and query.terms else self.view.display_key
+            # 归档只在查询变化（或删除归档任务）时重新搜索，内存任务的增删改不影响它
+            self._archive_results = self.search_history(query) if query else []
+        return self._search_results
+
+    def _forget_result(self, task):
+        """任务修改或删除之前调用：从当前查询结果中移除（按排序键二分定位，不重新查询）"""
+        results = self._search_results
+        if results is None:
+            return
+        key = self._result_key
+        value = key(task)
+        for pos in range(bisect_by_key(results, value, key), len(results)):
+            if results[pos] is task:
+                del results[pos]
+                return
+            if key(results[pos]) != value:
+                return
+
+    def _place_result(self, task):
+        """任务添加或修改之后调用：满足当前查询时按排序键插入结果"""
+        results = self._search_results
+        if results is not None and self._matches(task):
+            key = self._result_key
+            results.insert(bisect_by_key(results, key(task), key, right=True), task)
+
+    def _matches(self, task, query=None):
+        """单条任务是否满足查询（默认为当前查询），与 run_query 的结果一致"""
+        query = query or self._query
+        if query is None:
+            return True
+        if query.priorities is not None and task.priority not in query.priorities:
+            return False
+        if query.completed is not None and task.completed != query.completed:
+            return False
+        if query.has_deadline():
+            ordinal = task.deadline_ordinal
+            if ordinal < max(query.deadline_min or 1, 1) or (query.deadline_max is not None
+                                                             and ordinal > query.deadline_max):
+                return False
+        if query.has_tags():
+            tags = set(task.tags)
+            if tags & query.tags_excluded or not all(group & tags for group in query.tag_groups):
+                return False
+        if query.terms:
+            text = NgramIndex.normalize(task.text)
+            return all(term in text for term in NgramIndex.normalize(' '.join(query.terms)).split())
+        return True
+
+    def get_tasks_for_display(self):
+        """获取用于显示的任务列表（未完成任务按列表顺序，完成任务按日期降序）"""
+        return self.view.all()
 
     def sort_by_priority(self):
         """按优先级排序"""
@@ -118,33 +648,19 @@ class TaskManager:
             if self.sort_order['priority'] == Qt.SortOrder.AscendingOrder 
             else Qt.SortOrder.AscendingOrder)
         
-        incomplete_tasks = [t for t in self.tasks if not t.get('completed', False)]
-        completed_tasks = [t for t in self.tasks if t.get('completed', False)]
-        
-        def get_priority_value(task):
-            priority = task['priority']
-            if priority not in PRIORITY_VALUES:
-                # 再次检查映射（理论上load时已处理，但防万一）
-                old_to_new = {
-                    "紧急": "紧急重要",
-                    "高": "重要不紧急",
-                    "中": "紧急不重要",
-                    "低": "不紧急不重要"
-                }
-                priority = old_to_new.get(priority, "不紧急不重要")
-                task['priority'] = priority
-            return PRIORITY_VALUES.get(priority, 0)
+        incomplete_tasks = [t for t in self._index.values() if not t.completed]
+        completed_tasks = [t for t in self._index.values() if t.completed]
         
         try:
             incomplete_tasks.sort(
-                key=get_priority_value,
+                key=lambda x: x.priority,
                 reverse=(self.sort_order['priority'] == Qt.SortOrder.DescendingOrder)
             )
         except Exception as e:
             print(f"排序错误: {e}")
 
         # 更新主列表顺序
-        self.tasks = incomplete_tasks + completed_tasks
+        self._reorder(incomplete_tasks + completed_tasks)
         self.save_tasks()
         return self.sort_order['priority']
 
@@ -154,19 +670,25 @@ class TaskManager:
             if self.sort_order['deadline'] == Qt.SortOrder.AscendingOrder 
             else Qt.SortOrder.AscendingOrder)
         
-        incomplete_tasks = [t for t in self.tasks if not t.get('completed', False)]
-        completed_tasks = [t for t in self.tasks if t.get('completed', False)]
+        incomplete_tasks = [t for t in self._index.values() if not t.completed]
+        completed_tasks = [t for t in self._index.values() if t.completed]
         
         incomplete_tasks.sort(
-            key=lambda x: QDateTime.fromString(x['deadline'], 'yyyy-MM-dd'),
+            key=lambda x: x.deadline_ordinal,
             reverse=(self.sort_order['deadline'] == Qt.SortOrder.DescendingOrder)
         )
         
-        self.tasks = incomplete_tasks + completed_tasks
+        self._reorder(incomplete_tasks + completed_tasks)
         self.save_tasks()
         return self.sort_order['deadline']
 
+    def _reorder(self, tasks):
+        """按新的列表顺序排列同一批任务：只需重建有序的任务字典和显示视图"""
+        self._index = {t.uid: t for t in tasks}
+        self.view.rebuild(tasks)
+        self._search_results = None
+
     def update_tasks_list(self, new_tasks):
         """更新任务列表（通常用于重新排序后的同步）"""
-        self.tasks = new_tasks
+        self._rebuild_indexes([Task.from_dict(t) for t in new_tasks])
         self.save_tasks()
@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+
+
+class WriteBehindWriter:
+    """后台写线程
+
+    GUI 线程只把变更记录放入队列并标记为脏，写线程在延迟窗口内把一串
+    连续修改合并成一次写入，避免界面操作被磁盘 IO 阻塞。
+    version 为已提交的修改版本号，durable_version 为已落盘的版本号。
+    write_stats 滚动记录最近每次落盘的 (提交到落盘的延迟, 写入耗时)，单位毫秒。
+    """
+
+    def __init__(self, storage, latency_ms):
+        self.storage = storage
+        self.latency = latency_ms / 1000.0
+        self.pending = []        # 待写入的变更记录
+        self.snapshot = None     # 待写入的完整快照 (tasks, pomodoro_stats)，会取代之前的变更记录
+        self.version = 0
+        self.durable_version = 0
+        self.stopping = False
+        self.flush_requested = False
+        self.dirty_since = None  # 最早一条未落盘修改的提交时间
+        self.write_stats = deque(maxlen=120)
+        self.cond = threading.Condition()
+        self.thread = threading.Thread(target=self._run, name='TaskWriter', daemon=True)
+        self.thread.start()
+
+    def submit(self, record):
+        """提交一条变更记录"""
+        with self.cond:
+            self.pending.append(record)
+            self.version += 1
+            if self.dirty_since is None:
+                self.dirty_since = time.monotonic()
+            self.cond.notify_all()
+            return self.version
+
+    def submit_snapshot(self, tasks, pomodoro_stats):
+        """提交完整快照（调用方负责传入副本）"""
+        with self.cond:
+            self.snapshot = (tasks, pomodoro_stats)
+            self.pending = []
+            self.version += 1
+            if self.dirty_since is None:
+                self.dirty_since = time.monotonic()
+            self.cond.notify_all()
+            return self.version
+
+    def is_dirty(self):
+        return self.durable_version != self.version
+
+    def flush(self, timeout=None):
+        """立即写入所有未落盘的修改并等待完成"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.cond:
+            target = self.version
+            self.flush_requested = True
+            self.cond.notify_all()
+            while self.durable_version < target and self.thread.is_alive():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+            return self.durable_version >= target
+
+    def close(self):
+        """刷新剩余修改并停止写线程"""
+        with self.cond:
+            self.stopping = True
+            self.cond.notify_all()
+        self.thread.join()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while not (self.pending or self.snapshot) and not self.stopping:
+                    self.cond.wait()
+                if not (self.pending or self.snapshot):
+                    return  # stopping 且没有剩余修改
+                # 等待延迟窗口，让后续修改合并进同一次写入
+                window_end = time.monotonic() + self.latency
+                while not (self.stopping or self.flush_requested):
+                    remaining = window_end - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self.cond.wait(remaining)
+                snapshot, records, version = self.snapshot, self.pending, self.version
+                self.snapshot, self.pending = None, []
+                self.flush_requested = False
+                dirty_since, self.dirty_since = self.dirty_since, None
+
+            write_start = time.monotonic()
+            try:
+                if snapshot is not None:
+                    self.storage.save_all(*snapshot)
+                    print(f"成功保存数据: 任务 {len(snapshot[0])} 条")
+                if records and not self.storage.apply(records):
+                    raise IOError("存储后端不支持增量写入")
+            except Exception as e:
+                print(f"后台保存失败: {e}")
+                with self.cond:
+                    # 放回队列，下一轮重试（期间有新快照时以新快照为准）
+                    if self.snapshot is None:
+                        if snapshot is not None:
+                            self.snapshot = snapshot
+                        self.pending = records + self.pending
+                    if dirty_since is not None:
+                        self.dirty_since = dirty_since
+                    if self.stopping:
+                        # 不在退出时反复重试：未落盘的修改留在队列中，由调用方（见 TaskManager.close）同步保存
+                        return
+                    self.cond.wait(self.latency)
+                continue
+
+            now = time.monotonic()
+            with self.cond:
+                self.durable_version = version
+                if dirty_since is not None:
+                    self.write_stats.append(((now - dirty_since) * 1000, (now - write_start) * 1000))
+                self.cond.notify_all()
@@ -0,0 +1,91 @@
+import time
+from PyQt6.QtCore import QObject, QTimer
+
+from core.config import ANIMATIONS_ENABLED
+from .frame_scheduler import FRAME_MS
+
+
+class AnimationClock(QObject):
+    """全局动画时钟：一个计时器驱动所有进行中的动画
+
+    每个动画只登记时长和回调，时钟每帧按实际经过的时间计算进度，
+    界面繁忙导致计时器延迟时直接跳到当前进度（丢帧），动画总时长不变。
+    没有动画时计时器停止；关闭动画（低功耗模式）后新动画直接跳到结束。
+    """
+
+    def __init__(self, parent=None, interval_ms=FRAME_MS, enabled=ANIMATIONS_ENABLED):
+        super().__init__(parent)
+        self.enabled = enabled
+        self.animations = {}  # key -> [start, duration, on_frame, on_finished]
+        self.timer = QTimer(self)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.tick)
+
+    def animate(self, key, duration_ms, on_frame, on_finished=None):
+        """启动动画：每帧调用 on_frame(progress)（0~1），结束后调用 on_finished()
+
+        同一个 key 的动画会被替换（不调用旧动画的 on_finished）。
+        """
+        if not self.enabled or duration_ms <= 0:
+            self.animations.pop(key, None)
+            on_frame(1.0)
+            if on_finished:
+                on_finished()
+            return
+        self.animations[key] = [time.monotonic(), duration_ms / 1000.0, on_frame, on_finished]
+        on_frame(0.0)
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def cancel(self, key):
+        self.animations.pop(key, None)
+
+    def is_running(self, key):
+        return key in self.animations
+
+    def tick(self):
+        now = time.monotonic()
+        finished = []
+        for key, entry in list(self.animations.items()):
+            start, duration, on_frame, on_finished = entry
+            progress = min(1.0, (now - start) / duration)
+            try:
+                on_frame(progress)
+            except Exception as e:
+                print(f"动画更新失败: {e}")
+                progress = 1.0
+            if progress >= 1.0:
+                finished.append((key, entry))
+        for key, entry in finished:
+            # 回调里可能已经用同一个 key 启动了新动画，只移除本次结束的那个
+            if self.animations.get(key) is entry:
+                del self.animations[key]
+            if entry[3]:
+                entry[3]()
+        if not self.animations:
+            self.timer.stop()
+
+    def set_enabled(self, enabled):
+        """开关动画；关闭时进行中的动画立即结束"""
+        self.enabled = enabled
+        if not enabled:
+            self.finish_all()
+
+    def finish_all(self):
+        animations, self.animations = self.animations, {}
+        self.timer.stop()
+        for start, duration, on_frame, on_finished in animations.values():
+            on_frame(1.0)
+            if on_finished:
+                on_finished()
+
+
+_shared = None
+
+
+def shared_clock():
+    """进程内共用的动画时钟（需在 QApplication 创建之后调用）"""
+    global _shared
+    if _shared is None:
+        _shared = AnimationClock()
+    return _shared
@@ -0,0 +1,35 @@
+from PyQt6.QtCore import QObject, QTimer
+
+FRAME_MS = 16
+
+
+class FrameScheduler(QObject):
+    """把同一帧内重复请求的界面工作合并为一次执行
+
+    schedule(name, callback) 只登记工作，同名工作在一帧内只保留一份；
+    计时器到期时按登记顺序统一执行。拖动窗口边缘产生的大量 resize 事件
+    因此每帧最多触发一次布局。
+    """
+
+    def __init__(self, parent=None, interval_ms=FRAME_MS):
+        super().__init__(parent)
+        self.pending = {}  # name -> callback，保持登记顺序
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(interval_ms)
+        self.timer.timeout.connect(self.flush)
+
+    def schedule(self, name, callback):
+        self.pending[name] = callback
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def flush(self):
+        """立即执行所有待处理的工作"""
+        self.timer.stop()
+        pending, self.pending = self.pending, {}
+        for callback in pending.values():
+            try:
+                callback()
+            except Exception as e:
+                print(f"布局更新失败: {e}")
@@ -3,18 +3,32 @@ import uuid
 from datetime import datetime
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QGridLayout, QPushButton, QLineEdit, QComboBox, 
-                            QDateTimeEdit, QLabel, QTableWidget, QTableWidgetItem,
-                            QHeaderView, QSizePolicy, QDialog, QMenu, QCheckBox, QGraphicsOpacityEffect, 
+                            QDateTimeEdit, QLabel, QAbstractItemView,
+                            QHeaderView, QSizePolicy, QDialog, QMenu, QGraphicsOpacityEffect, 
                             QCalendarWidget, QMessageBox, QInputDialog)
-from PyQt6.QtCore import Qt, QDateTime, QPoint, QRect, QTimer, QPropertyAnimation, QEasingCurve, QEvent, QDate
-from PyQt6.QtGui import QColor, QFont, QKeySequence, QShortcut, QAction
+from PyQt6.QtCore import Qt, QDateTime, QPoint, QRect, QTimer, QEasingCurve, QEvent, QDate
+from PyQt6.QtGui import QKeySequence, QShortcut, QAction
 
-from core.config import get_current_version
+from core.config import get_current_version, CONTINUOUS_SCROLL
 from core.task_manager import TaskManager
+from core.task import Priority, task_key, normalize_tags
+from core.query import QueryError
 from .dialogs import DeleteConfirmDialog, ReminderDialog
 from .pomodoro_widget import PomodoroWidget
-from .styles import (MAIN_WINDOW_STYLE, MENU_STYLE, CHECKBOX_STYLE, 
-                    DELETE_BTN_STYLE, CALENDAR_STYLE)
+from .styles import MAIN_WINDOW_STYLE, MENU_STYLE, CALENDAR_STYLE
+from . import theme
+from .frame_scheduler import FrameScheduler
+from .animation_clock import shared_clock
+from .perf_hud import PerfHud, timed
+from .task_table import TaskTableModel, ScrollTaskTableModel, TaskTableView, TaskItemDelegate, TextDelegate, PriorityDelegate, DateDelegate, OperationDelegate
+
+SEARCH_HELP = ('输入关键字搜索，可组合过滤条件：\n'
+               'p:紧急重要（或 p:紧急重要,重要不紧急）  优先级\n'
+               'due<2025-12-31、due>=today、due<=+7  截止日期\n'
+               'done:no / done:yes  完成状态\n'
+               '#工作 #学习（同时有）、#工作|学习（有其一）、-#家里（没有）  标签')
+TAG_HINT_LIMIT = 12  # 编辑标签时提示的常用标签个数
+
 
 class TodoWidget(QMainWindow):
     def __init__(self):
@@ -47,6 +61,14 @@ class TodoWidget(QMainWindow):
         self.total_pages = 1  # 整数：总页数
         self.page_label = None  # 变量：分页状态标签控件
         self.pagination_widget = None  # 变量：分页容器控件
+        self.continuous_scroll = CONTINUOUS_SCROLL  # 布尔：连续滚动模式（不分页）
+
+        # 拖动窗口边缘时的布局工作合并到每帧一次
+        self.layout_scheduler = FrameScheduler(self)
+        self.animations = shared_clock()
+        self.input_bar_mode = None  # 字符串：输入栏当前的排列方式（按 380/300 像素断点）
+        self.calendar_popup = None  # 复用的日历弹窗
+        self.calendar_task_id = None  # 字符串：日历弹窗当前绑定的任务 id
 
         # 移除最小高度限制
         self.setMinimumHeight(0)
@@ -54,18 +76,22 @@ class TodoWidget(QMainWindow):
         # 设置最小宽度
         self.setMinimumWidth(160)
         
-        # 加载任务数据
-        self.task_manager.load_tasks()
-        
         # 初始化UI
         self.initUI()
         # self.apply_styles()  # 恢复原有基础样式，不应用粉色主题
         
-        self.refresh_table()
+        # 加载任务数据：第一块解析完立即显示第一页，其余分块继续加载
+        self.loader = None
+        self.load_timer = None
+        self.index_builder = None
+        self.index_timer = None
+        self.start_loading()
         
     def initUI(self):
         # 设置窗口标题（任务栏显示名称）
         self.setWindowTitle(f"TodoList V{get_current_version()}")
+        # 应用级样式表只编译、设置一次，之后只切换控件的动态属性
+        theme.install()
 
         # 设置窗口位置和初始大小
         self.setGeometry(50, 50, 380, 350)
@@ -96,6 +122,19 @@ class TodoWidget(QMainWindow):
         title_label.setObjectName("titleLabel")
         title_bar_layout.addWidget(title_label)
         title_bar_layout.addStretch()
+
+        # 计数徽标：各象限未完成数、过期数、今天完成数（为 0 时隐藏）
+        self.count_badges = {}
+        badges = [(p.name, p.label) for p in sorted(Priority, reverse=True)] + [('overdue', '已过期'), ('done', '今天完成')]
+        for badge, tooltip in badges:
+            label = QLabel()
+            label.setObjectName('countBadge')
+            label.setProperty('badge', badge)
+            label.setToolTip(tooltip)
+            label.setAlignment(Qt.AlignmentFlag.AlignCenter)
+            label.hide()
+            title_bar_layout.addWidget(label)
+            self.count_badges[badge] = label
         
         # 最小化、收缩和关闭按钮
         min_button = QPushButton('－')
@@ -181,22 +220,41 @@ class TodoWidget(QMainWindow):
         self.pomodoro_widget = PomodoroWidget(self.task_manager)
         layout.addWidget(self.pomodoro_widget)
         
-        # 表格设置
-        self.task_table = QTableWidget()
-        self.task_table.setColumnCount(4)
-        self.task_table.setHorizontalHeaderLabels(['待办事项', '优先级 ↕', '日期 ↕', '完成'])
+        # 表格设置：模型只持有当前页，优先级/日期/操作列由委托绘制，编辑器按需创建
+        if self.continuous_scroll:
+            self.task_model = ScrollTaskTableModel(self.task_manager, parent=self)
+        else:
+            self.task_model = TaskTableModel(self.task_manager, self)
+        self.task_model.task_changed.connect(self.on_task_edited, Qt.ConnectionType.QueuedConnection)
+        self.task_table = TaskTableView()
+        self.task_table.setObjectName('taskTable')
+        self.task_table.horizontalHeader().setObjectName('taskHeader')
+        self.task_table.setModel(self.task_model)
+        self.task_table.setItemDelegate(TaskItemDelegate(self.task_table))
+        self.text_delegate = TextDelegate(self.task_table)
+        self.priority_delegate = PriorityDelegate(self.task_table)
+        self.date_delegate = DateDelegate(self.task_table)
+        self.date_delegate.date_clicked.connect(self.show_calendar_for_task, Qt.ConnectionType.QueuedConnection)
+        self.operation_delegate = OperationDelegate(self.task_table)
+        # 委托信号在鼠标事件处理中发出，排队执行以免在事件处理中途重置模型
+        self.operation_delegate.toggled.connect(self.toggle_task_completion, Qt.ConnectionType.QueuedConnection)
+        self.operation_delegate.delete_requested.connect(self.confirm_delete_task, Qt.ConnectionType.QueuedConnection)
+        self.task_table.setItemDelegateForColumn(0, self.text_delegate)
+        self.task_table.setItemDelegateForColumn(1, self.priority_delegate)
+        self.task_table.setItemDelegateForColumn(2, self.date_delegate)
+        self.task_table.setItemDelegateForColumn(3, self.operation_delegate)
+        self.task_table.setMouseTracking(True)
         
         self.task_table.horizontalHeader().setSectionResizeMode(0, QHeaderView.ResizeMode.Stretch)
-        self.task_table.setEditTriggers(QTableWidget.EditTrigger.DoubleClicked)
-        self.task_table.setSelectionMode(QTableWidget.SelectionMode.NoSelection)
+        self.task_table.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked)
+        self.task_table.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.task_table.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.task_table.customContextMenuRequested.connect(self.show_context_menu)
-    
-        self.task_table.itemDoubleClicked.connect(self.handle_item_double_click)
-        self.task_table.itemChanged.connect(self.handle_item_changed)
 
         self.task_table.verticalHeader().setDefaultSectionSize(24)
         self.task_table.verticalHeader().setMinimumSectionSize(24)
+        # 行高固定，视图可以直接按行号定位，不必逐行计算高度（连续滚动模式下行数可达十万级）
+        self.task_table.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         self.task_table.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAsNeeded)
         
         header = self.task_table.horizontalHeader()
@@ -223,18 +281,33 @@ class TodoWidget(QMainWindow):
 
         prev_btn = QPushButton('<')
         prev_btn.setFixedSize(24, 24)
-        prev_btn.setStyleSheet('border:none;')
+        prev_btn.setObjectName('pageButton')
         prev_btn.clicked.connect(self.on_prev_page)
 
         page_label = QLabel('1/1')
         page_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        page_label.setStyleSheet('font-size:12px;color:#333;')
+        page_label.setObjectName('pageLabel')
 
         next_btn = QPushButton('>')
         next_btn.setFixedSize(24, 24)
-        next_btn.setStyleSheet('border:none;')
+        next_btn.setObjectName('pageButton')
         next_btn.clicked.connect(self.on_next_page)
 
+        # 搜索框：输入停顿后按文本和过滤条件筛选，结果分页显示
+        search_input = QLineEdit()
+        search_input.setObjectName('searchInput')
+        search_input.setPlaceholderText('搜索或过滤 (Ctrl+F)')
+        search_input.setClearButtonEnabled(True)
+        search_input.setToolTip(SEARCH_HELP)
+        search_input.setFixedHeight(22)
+        search_input.setMinimumWidth(0)
+        search_input.textChanged.connect(lambda _: self.search_timer.start())
+        self.search_timer = QTimer(self)
+        self.search_timer.setSingleShot(True)
+        self.search_timer.setInterval(150)
+        self.search_timer.timeout.connect(self.apply_search)
+
+        pagination_layout.addWidget(search_input, 1)
         pagination_layout.addWidget(prev_btn)
         pagination_layout.addWidget(page_label)
         pagination_layout.addWidget(next_btn)
@@ -243,9 +316,14 @@ class TodoWidget(QMainWindow):
         pagination_widget.setFixedHeight(26)
 
         self.pagination_widget = pagination_widget
+        self.search_input = search_input
         self.page_label = page_label
         self.prev_btn = prev_btn
         self.next_btn = next_btn
+        if self.continuous_scroll:
+            # 连续滚动模式下分页栏只显示任务总数和加载进度
+            prev_btn.hide()
+            next_btn.hide()
 
         layout.addWidget(self.pagination_widget)
 
@@ -286,6 +364,100 @@ class TodoWidget(QMainWindow):
         except Exception as e:
             print(f"快捷键注册失败: {e}")
 
+        try:
+            self.search_shortcut = QShortcut(QKeySequence('Ctrl+F'), self)
+            self.search_shortcut.activated.connect(self.focus_search)
+        except Exception as e:
+            print(f"快捷键注册失败: {e}")
+
+        # 跨天后过期数和今天完成数会变化，定时刷新徽标（只读取计数）
+        self.counter_timer = QTimer(self)
+        self.counter_timer.timeout.connect(self.update_counters)
+        self.counter_timer.start(60 * 1000)
+
+        # 开发者性能浮层
+        self.perf_hud = PerfHud(self)
+        try:
+            self.perf_hud_shortcut = QShortcut(QKeySequence('Ctrl+Shift+P'), self)
+            self.perf_hud_shortcut.activated.connect(self.perf_hud.toggle)
+        except Exception as e:
+            print(f"快捷键注册失败: {e}")
+        if PerfHud.enabled_by_env():
+            self.perf_hud.set_active(True)
+
+    def start_loading(self):
+        """开始分块加载任务数据，加载期间暂停编辑"""
+        self.loader = self.task_manager.iter_load_tasks()
+        self.load_timer = QTimer(self)
+        self.load_timer.timeout.connect(self.load_next_chunk)
+        self.input_widget.setEnabled(False)
+        self.search_input.setEnabled(False)
+        self.task_table.setEnabled(False)
+        self.load_next_chunk()
+        if self.loader is not None:
+            self.refresh_table()
+            self.load_timer.start(0)
+
+    def load_next_chunk(self):
+        """加载下一块任务，全部完成后恢复编辑并刷新"""
+        try:
+            next(self.loader)
+        except StopIteration:
+            self.loader = None
+            self.load_timer.stop()
+            self.input_widget.setEnabled(True)
+            self.search_input.setEnabled(True)
+            self.task_table.setEnabled(True)
+            self.pomodoro_widget.refresh_count()
+            self.refresh_table()
+            self.start_search_indexing()
+            return
+        self.update_pagination_ui()
+
+    def start_search_indexing(self):
+        """加载完成后在空闲时分块建立搜索索引，搜索时不必再等待"""
+        self.index_builder = self.task_manager.iter_build_search_index()
+        self.index_timer = QTimer(self)
+        self.index_timer.timeout.connect(self.build_next_index_chunk)
+        self.index_timer.start(0)
+
+    def build_next_index_chunk(self):
+        try:
+            next(self.index_builder)
+        except StopIteration:
+            self.index_timer.stop()
+            self.index_builder = None
+
+    def focus_search(self):
+        self.search_input.setFocus()
+        self.search_input.selectAll()
+
+    def apply_search(self):
+        """按搜索框内容（文本和过滤条件）筛选表格，回到第一页"""
+        try:
+            changed = self.task_manager.set_search(self.search_input.text())
+        except QueryError as e:
+            theme.set_state(self.search_input, invalid=True)
+            self.search_input.setToolTip(str(e))
+            return
+        theme.set_state(self.search_input, invalid=False)
+        self.search_input.setToolTip(SEARCH_HELP)
+        if changed:
+            self.current_page = 1
+            self.refresh_table()
+
+    def update_counters(self):
+        """刷新标题栏计数徽标（计数由 TaskManager 增量维护，这里只读取）"""
+        counts = {p.name: n for p, n in self.task_manager.quadrant_counts().items()}
+        counts['overdue'] = self.task_manager.count_overdue()
+        counts['done'] = self.task_manager.count_completed_today()
+        for badge, count in counts.items():
+            label = self.count_badges[badge]
+            text = str(count)
+            if label.text() != text:
+                label.setText(text)
+            label.setVisible(count > 0)
+
     def apply_styles(self):
         self.setStyleSheet(MAIN_WINDOW_STYLE)
 
@@ -308,25 +480,58 @@ class TodoWidget(QMainWindow):
         
         self.task_manager.add_task(task)
         self.task_input.clear()
-        self.refresh_table()
-        self.adjust_window_height()
+        self.update_table()
 
-    def delete_task(self, task):
+    def delete_task(self, task_id):
         """删除任务"""
-        self.task_manager.delete_task(task)
-        self.refresh_table()
-        self.adjust_window_height()
+        self.task_manager.remove(task_id)
+        self.update_table()
+
+    @timed('update')
+    def update_table(self, task_id=None):
+        """按差异刷新当前页：task_id 对应的行原地更新，只有顺序变化的行才移动
+
+        行数不变时不重新计算窗口高度，页数不变时不更新分页栏。
+        """
+        if self.continuous_scroll:
+            row_count = self.task_model.rowCount()
+            self.task_model.refresh()
+            if self.task_model.rowCount() != row_count:
+                self.adjust_window_height()
+                self.update_pagination_ui()
+            self.update_counters()
+            return
 
+        total_count = self.task_manager.count()
+        total_pages = max(1, (total_count + self.page_size - 1) // self.page_size)
+        current_page = min(max(self.current_page, 1), total_pages)
+        start_index = (current_page - 1) * self.page_size
+        display_tasks = self.task_manager.get_display_page(start_index, self.page_size)
+
+        row_count = self.task_model.rowCount()
+        changed = {task_key(task_id)} if task_id is not None else set()
+        self.task_model.apply_page(display_tasks, changed)
+        if self.task_model.rowCount() != row_count:
+            self.adjust_window_height()
+        if (total_pages, current_page) != (self.total_pages, self.current_page) or self.task_manager.search_query:
+            # 搜索时分页栏还显示匹配条数，每次都更新
+            self.total_pages, self.current_page = total_pages, current_page
+            self.update_pagination_ui()
+        self.update_counters()
+
+    @timed('refresh')
     def refresh_table(self):
-        """刷新表格显示"""
-        self.task_table.blockSignals(True)
-        # print("刷新表格显示-----信号已断开")
-        
-        # 获取用于显示的任务（已处理完成状态和排序）
-        all_display_tasks = self.task_manager.get_tasks_for_display()
+        """整体重建当前页（翻页、排序、加载完成时使用）"""
+        if self.continuous_scroll:
+            self.task_model.reload()
+            self.adjust_window_height()
+            self.update_pagination_ui()
+            self.update_table_font_by_window()
+            self.update_counters()
+            return
 
         # 计算总页数
-        total_count = len(all_display_tasks)
+        total_count = self.task_manager.count()
         self.total_pages = max(1, (total_count + self.page_size - 1) // self.page_size)
 
         if self.current_page > self.total_pages:
@@ -334,200 +539,50 @@ class TodoWidget(QMainWindow):
         if self.current_page < 1:
             self.current_page = 1
 
+        # 获取当前页用于显示的任务（已处理完成状态和排序）
         start_index = (self.current_page - 1) * self.page_size
-        end_index = start_index + self.page_size
-        display_tasks = all_display_tasks[start_index:end_index]
+        display_tasks = self.task_manager.get_display_page(start_index, self.page_size)
 
-        self.task_table.setRowCount(0)
-        
-        for task in display_tasks:
-            self._add_task_to_table(task)
+        self.task_model.set_tasks(display_tasks)
 
         self.adjust_window_height()
         self.update_pagination_ui()
         self.update_table_font_by_window()
-
-        self.task_table.blockSignals(False)
-        # print("刷新表格显示-----信号已连接")
+        self.update_counters()
 
         hsb = self.task_table.horizontalScrollBar()
         if hsb.maximum() > 0 and hsb.value() != 0:
             self.smooth_scrollbar(hsb, 0, 180)
 
-    def _add_task_to_table(self, task):
-        """添加任务到表格"""
-        current_row = self.task_table.rowCount()
-        self.task_table.insertRow(current_row)
-        
-        # 待办事项
-        task_text = task['text']
-            
-        if len(task_text) > 20:
-            task_text = task_text[:20] + '...'
-            
-        task_item = QTableWidgetItem(task_text)
-        task_item.setToolTip(task['text'])
-        task_item.setData(Qt.ItemDataRole.UserRole, task.get('id'))
-        
-        if task.get('completed', False):
-            font = task_item.font()
-            font.setStrikeOut(True)
-            task_item.setFont(font)
-            task_item.setForeground(QColor('#999999'))
-        
-        self.task_table.setItem(current_row, 0, task_item)
-        
-        # 优先级下拉框
-        priority_combo = QComboBox()
-        priority_combo.addItems(['紧急重要', '重要不紧急', '紧急不重要', '不紧急不重要'])
-        try:
-            priority_combo.setCurrentText(task['priority'])
-        except Exception as e:
-            priority_combo.setCurrentText('不紧急不重要')
-            task['priority'] = '不紧急不重要'
-        
-        priority_combo.setFixedSize(80, 24)
-        
-        current_priority = task['priority']
-        is_completed = task.get('completed', False)
-        
-        base_style = """
-            QComboBox {
-                border: none;
-                background: transparent;
-                padding-left: 4px;
-                %s
-            }
-            QComboBox::drop-down {
-                border: none;
-                width: 20px;
-            }
-            QComboBox QAbstractItemView {
-                border: 1px solid #e0e0e0;
-                background: white;
-                selection-background-color: #f5f5f5;
-            }
-            QComboBox QAbstractItemView::item[text="紧急重要"] { color: red; }
-            QComboBox QAbstractItemView::item[text="重要不紧急"] { color: orange; }
-        """
-        
-        if is_completed:
-            style_extra = "color: #999999; text-decoration: line-through;"
-        else:
-            if current_priority == '紧急重要':
-                style_extra = "color: #FF0000;"
-            elif current_priority == '重要不紧急':
-                style_extra = "color: orange;"
-            else:
-                style_extra = "color: black;"
-        
-        priority_combo.setStyleSheet(base_style % style_extra)
-        
-        if is_completed:
-            priority_combo.setEnabled(False)
-        
-        priority_combo.activated.connect(
-            lambda index, t=task: self.update_task_priority(t, priority_combo.itemText(index))
-        )
-        priority_combo.wheelEvent = lambda event: event.ignore()
-        self.task_table.setCellWidget(current_row, 1, priority_combo)
-        
-        # 截止时间
-        deadline = QDateTime.fromString(task['deadline'], 'yyyy-MM-dd')
-        deadline_str = deadline.toString('MM-dd')
-        
-        date_btn = QPushButton(deadline_str)
-        date_btn.setFixedSize(50, 24)
-        
-        if task.get('completed', False):
-            date_btn.setStyleSheet("""
-                QPushButton {
-                    border: none;
-                    background: transparent;
-                    color: #999999;
-                    text-decoration: line-through;
-                }
-            """)
-            date_btn.setEnabled(False)
-        else:
-            if deadline.date() < QDate.currentDate():
-                text_color = 'red'
-                font_weight = "bold"
-            else:
-                text_color = 'black'
-                font_weight = "normal"
-            
-            date_btn.setStyleSheet(f"""
-                QPushButton {{
-                    border: none;
-                    background-color: transparent;
-                    color: {text_color};
-                    font-weight: {font_weight};
-                    text-align: left;
-                    padding-left: 0px;
-                }}
-                QPushButton:hover {{
-                    background-color: #f5f5f5;
-                }}
-            """)
-            
-            date_btn.clicked.connect(lambda: self.show_calendar_for_task(task, date_btn))
-            
-        self.task_table.setCellWidget(current_row, 2, date_btn)
-        
-        # 操作列
-        operation_widget = QWidget()
-        operation_layout = QHBoxLayout(operation_widget)
-        operation_layout.setContentsMargins(0, 0, 0, 0)
-        operation_layout.setSpacing(5)
-        operation_layout.setAlignment(Qt.AlignmentFlag.AlignCenter)
-        
-        checkbox = QCheckBox()
-        checkbox.setChecked(task.get('completed', False))
-        checkbox.setStyleSheet(CHECKBOX_STYLE)
-        checkbox.stateChanged.connect(lambda state, t=task: self.toggle_task_completion(t, state))
-        
-        delete_btn = QPushButton("×")
-        delete_btn.setFixedSize(16, 16)
-        delete_btn.setStyleSheet(DELETE_BTN_STYLE)
-        delete_btn.clicked.connect(lambda _, t=task: self.confirm_delete_task(t))
-        
-        operation_layout.addWidget(checkbox)
-        operation_layout.addWidget(delete_btn)
-        self.task_table.setCellWidget(current_row, 3, operation_widget)
-        self.task_table.setRowHeight(current_row, 24)
-
-    def show_calendar_for_task(self, task, date_btn):
-        calendar = QCalendarWidget(self)
-        calendar.setWindowFlags(Qt.WindowType.Popup)
-        calendar.setGridVisible(True)
-        calendar.setStyleSheet(CALENDAR_STYLE)
-        
-        pos = date_btn.mapToGlobal(date_btn.rect().bottomLeft())
+    def show_calendar_for_task(self, task_id, pos):
+        task = self.task_manager.get(task_id)
+        if task is None:
+            return
+        # 日历弹窗只创建一次，之后每次重新绑定到点击的任务
+        calendar = self.calendar_popup
+        if calendar is None:
+            calendar = self.calendar_popup = QCalendarWidget(self)
+            calendar.setWindowFlags(Qt.WindowType.Popup)
+            calendar.setGridVisible(True)
+            calendar.setStyleSheet(CALENDAR_STYLE)
+            calendar.clicked.connect(self.on_calendar_date_selected)
+        self.calendar_task_id = task_id
+
         calendar.move(pos)
-        
-        deadline = QDateTime.fromString(task['deadline'], 'yyyy-MM-dd')
-        calendar.setSelectedDate(deadline.date())
-        
-        def date_selected(qdate):
-            new_deadline = qdate.toString('yyyy-MM-dd')
-            if task['deadline'] != new_deadline:
-                task['deadline'] = new_deadline
-                date_btn.setText(qdate.toString('MM-dd'))
-                self.task_manager.save_tasks()
-                self.refresh_table()
-            calendar.close()
-        
-        calendar.clicked.connect(date_selected)
+
+        deadline = task.deadline_date()
+        if deadline:
+            calendar.setSelectedDate(QDate(deadline.year, deadline.month, deadline.day))
         calendar.show()
 
-    def update_task_priority(self, task, new_priority):
-        if task['priority'] != new_priority:
-            task['priority'] = new_priority
-            self.task_manager.save_tasks()
-            self.refresh_table()
+    def on_calendar_date_selected(self, qdate):
+        task_id = self.calendar_task_id
+        new_deadline = qdate.toString('yyyy-MM-dd')
+        if task_id is not None and self.task_manager.update(task_id, deadline=new_deadline):
+            self.update_table(task_id)
+        self.calendar_popup.close()
 
-    def confirm_delete_task(self, task):
+    def confirm_delete_task(self, task_id):
         dialog = DeleteConfirmDialog(self)
         # 计算居中位置：基于主窗口当前的几何中心
         main_geo = self.frameGeometry()
@@ -536,32 +591,11 @@ class TodoWidget(QMainWindow):
         y = center.y() - dialog.height() // 2
         dialog.move(x, y)
         if dialog.exec() == QDialog.DialogCode.Accepted:
-            self.delete_task(task)
+            self.delete_task(task_id)
 
-    def handle_item_double_click(self, item):
-        row = item.row()
-        column = item.column()
-        item_id = item.data(Qt.ItemDataRole.UserRole)
-        task = next((t for t in self.task_manager.tasks if t.get('id') == item_id), None)
-        if task is None:
-            return
-        
-        if column == 0:
-            self.task_table.editItem(item)
-
-    def handle_item_changed(self, item):
-        column = item.column()
-        item_id = item.data(Qt.ItemDataRole.UserRole)
-        task = next((t for t in self.task_manager.tasks if t.get('id') == item_id), None)
-        if task is None:
-            return
-        
-        if column == 0:
-            new_text = item.text().strip()
-            if new_text and task['text'] != new_text:
-                task['text'] = new_text
-                self.task_manager.save_tasks()
-                self.refresh_table()
+    def on_task_edited(self, task_id):
+        """表格内修改了文本或优先级"""
+        self.update_table(task_id)
 
     def on_header_clicked(self, logical_index):
         if logical_index == 1:
@@ -569,80 +603,69 @@ class TodoWidget(QMainWindow):
             self.refresh_table()
             arrow = '↓' if sort_order == Qt.SortOrder.DescendingOrder else '↑'
             headers = ['待办事项', f'优先级 {arrow}', '日期 ↕', '完成']
-            self.task_table.setHorizontalHeaderLabels(headers)
+            self.task_model.set_headers(headers)
         elif logical_index == 2:
             sort_order = self.task_manager.sort_by_deadline()
             self.refresh_table()
             arrow = '↓' if sort_order == Qt.SortOrder.DescendingOrder else '↑'
             headers = ['待办事项', '优先级 ↕', f'日期 {arrow}', '操作']
-            self.task_table.setHorizontalHeaderLabels(headers)
-
-    def toggle_task_completion(self, task, state):
-        is_completed = state == Qt.CheckState.Checked.value
-        current_row = None
-        for row in range(self.task_table.rowCount()):
-            item0 = self.task_table.item(row, 0)
-            if item0 and item0.data(Qt.ItemDataRole.UserRole) == task.get('id'):
-                current_row = row
-                break
-        
-        if current_row is not None:
-            self.animate_row_completion(current_row, is_completed, task)
-
-    def animate_row_completion(self, row, is_completed, task):
-        def update_opacity(value):
-            for col in range(self.task_table.columnCount()):
-                item = self.task_table.item(row, col)
-                if item:
-                    color = item.foreground().color()
-                    color.setAlpha(int(255 * (1 - value)))
-                    item.setForeground(color)
-                    font = item.font()
-                    font.setStrikeOut(value == 1.0 and is_completed)
-                    item.setFont(font)
-            self.task_table.viewport().update()
-        
-        duration = 500
-        frames = 20
-        current_frame = 0
-        
-        def animate_frame():
-            nonlocal current_frame
-            if current_frame <= frames:
-                progress = current_frame / frames
-                update_opacity(progress)
-                current_frame += 1
-            else:
-                timer.stop()
-                self.update_task_status(task, is_completed)
-        
-        timer = QTimer(self)
-        timer.timeout.connect(animate_frame)
-        timer.start(duration // frames)
+            self.task_model.set_headers(headers)
+
+    def toggle_task_completion(self, task_id, is_completed):
+        if self.task_model.row_of(task_id) is not None:
+            self.animate_row_completion(is_completed, task_id)
+
+    def animate_row_completion(self, is_completed, task_id):
+        # 由全局动画时钟驱动，多行同时切换也只有一个计时器
+        uid = task_key(task_id)
+
+        def finished():
+            self.task_model.set_fade(uid, None)
+            self.update_task_status(task_id, is_completed)
+
+        self.animations.animate(('complete', uid), 500,
+                                lambda progress: self.task_model.set_fade(uid, progress), finished)
 
-    def update_task_status(self, task, is_completed):
-        task['completed'] = is_completed
-        self.task_manager.save_tasks()
-        # 刷新表格会重新排序
-        self.refresh_table()
+    def update_task_status(self, task_id, is_completed):
+        if not is_completed and self.task_manager.get(task_id) is None:
+            # 取消完成的归档任务：先移回主数据
+            self.task_manager.restore(task_id)
+        self.task_manager.update(task_id, completed=is_completed)
+        # 完成状态决定分区，行会移动到新位置（或移出当前页）
+        self.update_table(task_id)
 
     def show_context_menu(self, pos):
-        item = self.task_table.itemAt(pos)
-        if not item: return
-        row = item.row()
-        id_item = self.task_table.item(row, 0)
-        if not id_item: return
-        task_id = id_item.data(Qt.ItemDataRole.UserRole)
-        task = next((t for t in self.task_manager.tasks if t.get('id') == task_id), None)
-        if not task: return
+        index = self.task_table.indexAt(pos)
+        if not index.isValid(): return
+        task = self.task_model.task_at(index.row())
+        if not task or self.task_manager.is_archived(task): return
 
         menu = QMenu(self)
         menu.setStyleSheet(MENU_STYLE)
         
         # 移除提醒相关菜单
+        edit_tags = menu.addAction("编辑标签…")
+        edit_tags.triggered.connect(lambda: self.edit_task_tags(task.id))
         
         menu.exec(self.task_table.mapToGlobal(pos))
 
+    def edit_task_tags(self, task_id):
+        """编辑任务标签：空格或逗号分隔，留空表示清除"""
+        task = self.task_manager.get(task_id)
+        if task is None:
+            return
+        known = ' '.join('#' + tag for tag, _ in self.task_manager.all_tags()[:TAG_HINT_LIMIT])
+        label = '标签（空格或逗号分隔）：' + (f'\n已有：{known}' if known else '')
+        text, ok = QInputDialog.getText(self, '编辑标签', label, text=' '.join(task.tags))
+        if ok and self.task_manager.update(task_id, tags=normalize_tags(text)):
+            self.update_table(task_id)
+
+    def closeEvent(self, event):
+        # 进行中的完成动画直接结束，确保状态在退出前写入
+        self.animations.finish_all()
+        self.task_manager.close()
+        super().closeEvent(event)
+
     # --- 窗口交互、调整大小、收缩等逻辑 ---
     # 为了保持代码简洁，这里直接复制原有逻辑，稍作适配
     
@@ -654,7 +677,7 @@ class TodoWidget(QMainWindow):
         padding = 10
         header_height = self.task_table.horizontalHeader().height()
         row_height = 24
-        row_count = self.task_table.rowCount()
+        row_count = self.task_model.rowCount()
         content_height = row_height if row_count == 0 else row_height * row_count
         total_height = (title_height + input_height + pomodoro_height + header_height + content_height + footer_height + padding * 2)
 
@@ -753,68 +776,53 @@ class TodoWidget(QMainWindow):
 
     def resizeEvent(self, event):
         super().resizeEvent(event)
+        # 只登记工作，同一帧内的多次 resize 合并为一次布局
         if hasattr(self, 'task_table'):
-            content_width = self.width() - 5
+            self.layout_scheduler.schedule('table', self.layout_table)
+            self.layout_scheduler.schedule('font', self.update_table_font_by_window)
+        self.layout_scheduler.schedule('input_bar', self.relayout_input_bar)
+
+    def layout_table(self):
+        content_width = self.width() - 5
+        if self.task_table.width() != content_width:
             self.task_table.setFixedWidth(content_width)
-            self.task_table.setColumnWidth(1, 80)
-            self.task_table.setColumnWidth(2, 50)
-            self.task_table.setColumnWidth(3, 50)
+            self.verify_column_widths()
             self.task_table.horizontalHeader().updateGeometry()
             self.task_table.updateGeometry()
-            
-            hsb = self.task_table.horizontalScrollBar()
-            vsb = self.task_table.verticalScrollBar()
-            if hsb.maximum() == 0: hsb.setValue(0)
-            elif hsb.value() != 0: self.smooth_scrollbar(hsb, 0, 180)
-            if vsb.maximum() == 0: vsb.setValue(0)
-            
-            self.update_table_font_by_window()
-        
-        try:
-            self.relayout_input_bar()
-        except: pass
+
+        hsb = self.task_table.horizontalScrollBar()
+        vsb = self.task_table.verticalScrollBar()
+        if hsb.maximum() == 0: hsb.setValue(0)
+        elif hsb.value() != 0: self.smooth_scrollbar(hsb, 0, 180)
+        if vsb.maximum() == 0: vsb.setValue(0)
 
     def update_table_font_by_window(self):
-        w, h = self.width(), self.height()
-        if w <= 480 or h <= 360:
-            self.apply_table_font(11)
-        elif w <= 640 or h <= 540:
-            self.apply_table_font(13)
-        else:
-            self.apply_table_font(15)
-
-    def apply_table_font(self, size_px):
-        table_font = QFont()
-        table_font.setPixelSize(size_px)
-        self.task_table.setFont(table_font)
-        item_css = f"font-size: {size_px}px;"
-        for row in range(self.task_table.rowCount()):
-            for col_idx in [1, 2, 3]:
-                widget = self.task_table.cellWidget(row, col_idx)
-                if widget:
-                    if col_idx == 3: # 操作列
-                        for child in widget.findChildren(QWidget):
-                            if isinstance(child, QPushButton):
-                                child.setStyleSheet(child.styleSheet() + f"\nQPushButton {{{item_css}}}")
-                    else:
-                        widget.setStyleSheet(widget.styleSheet() + f"\nQWidget {{{item_css}}}")
+        # 字体档位由应用级样式表按 fontTier 属性匹配，委托按表格字体绘制；
+        # 档位（480/640 断点）不变时 set_state 不做任何事
+        tier = theme.font_tier(self.width(), self.height())
+        theme.set_state(self.task_table, fontTier=tier)
+        theme.set_state(self.task_table.horizontalHeader(), fontTier=tier)
 
     def relayout_input_bar(self):
         if not hasattr(self, 'input_widget'): return
         # print(f"DEBUG: relayout_input_bar called, window width={self.width()}")
         layout = self.input_widget.layout()
         if not isinstance(layout, QGridLayout): return
+        width = self.width()
+        mode = 'wide' if width >= 380 else 'medium' if width >= 300 else 'narrow'
+        # 只在跨过断点时才拆掉重排
+        if mode == self.input_bar_mode: return
+        self.input_bar_mode = mode
         while layout.count():
             item = layout.takeAt(0)
             w = item.widget()
             if w: w.setParent(self.input_widget)
-        width = self.width()
-        if width >= 380:
+        if mode == 'wide':
             layout.addWidget(self.task_input, 0, 0, 1, 3)
             layout.addWidget(self.priority_combo, 0, 3, 1, 1)
             layout.addWidget(self.deadline_edit, 0, 4, 1, 1)
             layout.addWidget(self.add_button, 0, 5, 1, 1)
-        elif width >= 300:
+        elif mode == 'medium':
             layout.addWidget(self.task_input, 0, 0, 1, 6)
             layout.addWidget(self.priority_combo, 1, 0, 1, 2)
             layout.addWidget(self.deadline_edit, 1, 2, 1, 2)
@@ -826,18 +834,25 @@ class TodoWidget(QMainWindow):
             layout.addWidget(self.add_button, 3, 0, 1, 6)
 
     def smooth_scrollbar(self, scrollbar, to_value, duration=200):
-        try:
-            anim = QPropertyAnimation(scrollbar, b"value", self)
-            anim.setDuration(duration)
-            anim.setStartValue(scrollbar.value())
-            anim.setEndValue(to_value)
-            anim.setEasingCurve(QEasingCurve.Type.InOutCubic)
-            anim.start()
-        except: pass
+        start_value = scrollbar.value()
+        curve = QEasingCurve(QEasingCurve.Type.InOutCubic)
+        self.animations.animate(
+            ('scroll', id(scrollbar)), duration,
+            lambda progress: scrollbar.setValue(
+                round(start_value + (to_value - start_value) * curve.valueForProgress(progress))))
 
     def update_pagination_ui(self):
         if self.page_label:
-            self.page_label.setText(f"{self.current_page}/{self.total_pages}")
+            if self.continuous_scroll:
+                text = f"{'匹配' if self.task_manager.search_query else '共'} {self.task_model.rowCount()} 条"
+            elif self.task_manager.search_query:
+                text = f"匹配 {self.task_manager.count()} 条 {self.current_page}/{self.total_pages}"
+            else:
+                text = f"{self.current_page}/{self.total_pages}"
+            if self.task_manager.loading:
+                text += f" 加载中 {int(self.task_manager.load_progress * 100)}%"
+            self.page_label.setText(text)
+            theme.set_state(self.page_label, loading=self.task_manager.loading)
         if self.prev_btn:
             self.prev_btn.setEnabled(self.current_page > 1)
         if self.next_btn:
@@ -0,0 +1,152 @@
+import functools
+import os
+import time
+from collections import deque
+from PyQt6.QtWidgets import QLabel, QWidget
+from PyQt6.QtCore import Qt, QTimer, QElapsedTimer
+
+from core.config import PERF_HUD_ENV, PERF_HUD_HISTORY
+
+SPARK_CHARS = '▁▂▃▄▅▆▇█'
+
+
+class PerfStats:
+    """按名称滚动记录耗时样本（毫秒），只保留最近 PERF_HUD_HISTORY 个"""
+
+    def __init__(self, size=PERF_HUD_HISTORY):
+        self.size = size
+        self.samples = {}
+
+    def record(self, name, ms):
+        history = self.samples.get(name)
+        if history is None:
+            history = self.samples[name] = deque(maxlen=self.size)
+        history.append(ms)
+
+    def history(self, name):
+        return self.samples.get(name, ())
+
+    def clear(self):
+        self.samples.clear()
+
+
+perf_stats = PerfStats()
+
+
+def timed(name):
+    """装饰器：把每次调用的耗时记入 perf_stats[name]"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                perf_stats.record(name, (time.perf_counter() - start) * 1000)
+        return wrapper
+    return decorator
+
+
+def sparkline(values, width=24):
+    """把最近 width 个样本画成一行方块字符"""
+    values = list(values)[-width:]
+    if not values:
+        return ''
+    top = max(values) or 1.0
+    return ''.join(SPARK_CHARS[min(len(SPARK_CHARS) - 1, int(v / top * len(SPARK_CHARS)))] for v in values)
+
+
+def summary(values):
+    """(最近一次, 平均, 最大)，没有样本时返回 None"""
+    values = list(values)
+    if not values:
+        return None
+    return values[-1], sum(values) / len(values), max(values)
+
+
+class PerfHud(QLabel):
+    """开发者性能浮层：显示表格刷新、逐行绘制、保存延迟、控件数量和事件循环延迟
+
+    Ctrl+Shift+P 切换显示，或启动前设置环境变量 TODO_PERF_HUD=1。
+    隐藏时心跳和刷新计时器都停止，只保留 perf_stats 的样本记录。
+    """
+
+    HEARTBEAT_MS = 50
+    REFRESH_MS = 500
+
+    def __init__(self, todo_widget):
+        super().__init__(todo_widget.task_table)
+        self.todo_widget = todo_widget
+        self.setObjectName('perfHud')
+        self.setAttribute(Qt.WidgetAttribute.WA_TransparentForMouseEvents)
+        self.setTextFormat(Qt.TextFormat.PlainText)
+        self.hide()
+
+        # 心跳：计时器实际间隔超出设定值的部分即为事件循环延迟
+        self.heartbeat = QTimer(self)
+        self.heartbeat.setTimerType(Qt.TimerType.PreciseTimer)
+        self.heartbeat.setInterval(self.HEARTBEAT_MS)
+        self.heartbeat.timeout.connect(self.on_heartbeat)
+        self.elapsed = QElapsedTimer()
+
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setInterval(self.REFRESH_MS)
+        self.refresh_timer.timeout.connect(self.refresh)
+
+    @staticmethod
+    def enabled_by_env():
+        return os.environ.get(PERF_HUD_ENV, '') not in ('', '0')
+
+    def toggle(self):
+        self.set_active(not self.isVisible())
+
+    def set_active(self, active):
+        table = self.todo_widget.task_table
+        if active:
+            table.paint_observer = self.on_table_painted
+            self.elapsed.start()
+            self.heartbeat.start()
+            self.refresh_timer.start()
+            self.show()
+            self.raise_()
+            self.refresh()
+        else:
+            table.paint_observer = None
+            self.heartbeat.stop()
+            self.refresh_timer.stop()
+            self.hide()
+
+    def on_heartbeat(self):
+        perf_stats.record('lag', max(0, self.elapsed.restart() - self.HEARTBEAT_MS))
+
+    def on_table_painted(self, ms, rows):
+        perf_stats.record('paint', ms)
+        if rows:
+            perf_stats.record('row', ms / rows)
+
+    def refresh(self):
+        lines = []
+        for label, name in (('整页刷新', 'refresh'), ('增量刷新', 'update'),
+                            ('表格绘制', 'paint'), ('每行绘制', 'row'), ('事件循环', 'lag')):
+            lines.append(self._format(label, perf_stats.history(name)))
+
+        writer = self.todo_widget.task_manager.writer
+        stats = list(writer.write_stats) if writer else []
+        lines.append(self._format('保存延迟', [latency for latency, _ in stats]))
+        lines.append(self._format('写盘耗时', [duration for _, duration in stats]))
+
+        table = self.todo_widget.task_table
+        widgets = len(table.findChildren(QWidget))
+        lines.append(f'表格控件 {widgets:>5}  行 {table.model().rowCount()}')
+        self.setText('\n'.join(lines))
+        self.adjustSize()
+        viewport = table.viewport()
+        self.move(viewport.x() + viewport.width() - self.width() - 4, viewport.y() + 4)
+
+    @staticmethod
+    def _format(label, values):
+        stat = summary(values)
+        if stat is None:
+            return f'{label}      -'
+        last, avg, peak = stat
+        return f'{label} {last:7.2f} 均{avg:7.2f} 峰{peak:7.2f} {sparkline(values)}'
@@ -155,6 +155,10 @@ class PomodoroWidget(QWidget):
         self.manager.state_changed.connect(self.update_buttons)
         self.manager.pomodoro_completed.connect(self.on_completed)
         
+    def refresh_count(self):
+        """数据加载完成后刷新今日计数"""
+        self.count_label.setText(f"今日: 🍅 × {self.manager.get_today_count()}")
+
     def toggle_timer(self):
         if self.manager.is_running:
             self.manager.pause_timer()
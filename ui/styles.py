@@ -38,14 +38,14 @@ MAIN_WINDOW_STYLE = """
     QPushButton:hover {
         background-color: #45a049;
     }
-    QTableWidget {
+    QTableView {
         background-color: transparent;
         border: none;
         gridline-color: #e0e0e0;
         margin: 0px;
         padding: 0px;
     }
-    QTableWidget::item {
+    QTableView::item {
         background-color: rgba(255, 255, 255, 0.7);
         border-radius: 4px;
         padding: 2px;
@@ -85,45 +85,74 @@ MENU_STYLE = """
     }
 """
 
-CHECKBOX_STYLE = """
-    QCheckBox {
-        spacing: 0px;
+# 界面配色：表格委托绘制与应用级样式表共用
+PALETTE = {
+    'text': '#000000',
+    'completed': '#999999',
+    'overdue': '#FF0000',
+    'urgent_important': '#FF0000',
+    'important_not_urgent': '#FFA500',
+    'check': '#4CAF50',
+    'check_hover': '#45a049',
+    'delete': '#666666',
+    'delete_hover': '#ff4d4d',
+    'page_text': '#333333',
+    'page_loading': '#999999',
+    'invalid': '#FF4D4D',
+    'urgent_not_important': '#4A90E2',
+    'badge': '#9E9E9E',
+    'tag': '#5C8DB8',
+}
+
+# 表格字体档位（像素），按窗口大小切换
+FONT_TIERS = {'small': 11, 'medium': 13, 'large': 15}
+
+# 应用级样式表：只通过 objectName 和动态属性匹配，状态变化时切换属性即可，
+# 字体档位、优先级颜色等规则由 ui/theme.py 按 PALETTE / FONT_TIERS 生成后追加
+APP_STYLE = """
+    QComboBox#priorityEditor {
+        border: none;
+        background: white;
+        padding-left: 4px;
     }
-    QCheckBox::indicator {
-        width: 10px;
-        height: 10px;
+    QComboBox#priorityEditor::drop-down {
+        border: none;
+        width: 20px;
     }
-    QCheckBox::indicator:unchecked {
-        border: 2px solid #4CAF50;
-        border-radius: 2px;
-        background-color: white;
+    QComboBox#priorityEditor QAbstractItemView {
+        border: 1px solid #e0e0e0;
+        background: white;
+        selection-background-color: #f5f5f5;
     }
-    QCheckBox::indicator:checked {
-        border: 2px solid #4CAF50;
-        border-radius: 2px;
-        background-color: #4CAF50;
-        image: url(:/resources/checked.png);
+    QComboBox#priorityEditor QAbstractItemView::item[text="紧急重要"] { color: red; }
+    QComboBox#priorityEditor QAbstractItemView::item[text="重要不紧急"] { color: orange; }
+    QPushButton#pageButton {
+        border: none;
     }
-    QCheckBox::indicator:unchecked:hover {
-        border-color: #45a049;
-        background-color: rgba(76, 175, 80, 0.1);
+    QLabel#pageLabel {
+        font-size: 12px;
     }
-    QCheckBox::indicator:checked:hover {
-        border-color: #45a049;
-        background-color: #45a049;
-    }
-"""
-
-DELETE_BTN_STYLE = """
-    QPushButton {
-        background-color: transparent;
-        border: none;
-        color: #666666;
-        font-size: 14px;
-        font-weight: bold;
+    QLineEdit#searchInput {
+        border: 1px solid #e0e0e0;
+        border-radius: 3px;
+        padding: 0 4px;
+        font-size: 12px;
     }
-    QPushButton:hover {
-        color: #ff4d4d;
+    QLabel#countBadge {
+        color: white;
+        border-radius: 7px;
+        padding: 0 4px;
+        font-size: 10px;
+        min-height: 14px;
+        max-height: 14px;
+    }
+    QLabel#perfHud {
+        background-color: rgba(0, 0, 0, 170);
+        color: #7CFC00;
+        font-family: Consolas, "Courier New", monospace;
+        font-size: 11px;
+        padding: 4px;
+        border-radius: 4px;
     }
 """
 
@@ -0,0 +1,570 @@
+import time
+from datetime import date
+from PyQt6.QtWidgets import QTableView, QStyledItemDelegate, QAbstractItemDelegate, QComboBox, QStyle, QStyleOptionViewItem
+from PyQt6.QtCore import Qt, QAbstractTableModel, QModelIndex, QRect, QRectF, QPoint, QPointF, QEvent, QTimer, pyqtSignal
+from PyQt6.QtGui import QColor, QPainter, QPen, QPainterPath, QCursor, QFontMetrics
+
+from core.task import Priority, task_key
+from . import theme
+
+# 自定义数据角色：整条任务对象
+TASK_ROLE = Qt.ItemDataRole.UserRole + 1
+
+PRIORITY_ITEMS = ['紧急重要', '重要不紧急', '紧急不重要', '不紧急不重要']
+
+
+class TaskTableModel(QAbstractTableModel):
+    """任务表格的数据模型，只持有当前页的任务
+
+    文本、优先级和日期通过 setData 写回 TaskManager，有修改时发出 task_changed。
+    """
+
+    HEADERS = ['待办事项', '优先级 ↕', '日期 ↕', '完成']
+    task_changed = pyqtSignal(str)
+
+    def __init__(self, task_manager, parent=None):
+        super().__init__(parent)
+        self.task_manager = task_manager
+        self.tasks = []
+        self.headers = list(self.HEADERS)
+        self.fading = {}  # uid -> 0~1，完成动画期间的淡出进度
+        self.today = date.today().toordinal()
+
+    def set_tasks(self, tasks):
+        """替换当前页的任务（翻页、排序时整体重建）"""
+        self.beginResetModel()
+        self.tasks = list(tasks)
+        self.fading = {}
+        self.today = date.today().toordinal()
+        self.endResetModel()
+
+    def apply_page(self, tasks, changed=()):
+        """按差异更新当前页
+
+        不再出现的行被删除，顺序变化的行被移动，新出现的行被插入，
+        其余行保持不动；changed 中的任务（uid）只原地刷新。
+        """
+        new_uids = {t.uid for t in tasks}
+        for row in range(len(self.tasks) - 1, -1, -1):
+            if self.tasks[row].uid not in new_uids:
+                self.beginRemoveRows(QModelIndex(), row, row)
+                self.fading.pop(self.tasks[row].uid, None)
+                del self.tasks[row]
+                self.endRemoveRows()
+
+        for row, task in enumerate(tasks):
+            if row < len(self.tasks) and self.tasks[row].uid == task.uid:
+                self.tasks[row] = task  # 归档分段重新读取后对象可能不同
+                continue
+            source = next((i for i in range(row + 1, len(self.tasks)) if self.tasks[i].uid == task.uid), None)
+            if source is not None:
+                self.beginMoveRows(QModelIndex(), source, source, QModelIndex(), row)
+                del self.tasks[source]
+                self.tasks.insert(row, task)
+                self.endMoveRows()
+            else:
+                self.beginInsertRows(QModelIndex(), row, row)
+                self.tasks.insert(row, task)
+                self.endInsertRows()
+
+        for row, task in enumerate(self.tasks):
+            if task.uid in changed:
+                self.dataChanged.emit(self.index(row, 0), self.index(row, self.columnCount() - 1))
+
+    def set_headers(self, headers):
+        self.headers = list(headers)
+        self.headerDataChanged.emit(Qt.Orientation.Horizontal, 0, len(self.headers) - 1)
+
+    def is_virtual(self):
+        return False
+
+    def task_at(self, row):
+        return self.tasks[row] if 0 <= row < len(self.tasks) else None
+
+    def row_of(self, task_id):
+        return self.row_of_uid(task_key(task_id))
+
+    def row_of_uid(self, uid):
+        for row, task in enumerate(self.tasks):
+            if task.uid == uid:
+                return row
+        return None
+
+    def set_fade(self, uid, value):
+        """设置任务的淡出进度（0 为不透明，1 为完全透明），任务在当前显示范围内时重绘该行"""
+        if value is None:
+            self.fading.pop(uid, None)
+        else:
+            self.fading[uid] = value
+        row = self.row_of_uid(uid)
+        if row is not None:
+            self.dataChanged.emit(self.index(row, 0), self.index(row, 2), [Qt.ItemDataRole.ForegroundRole])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.tasks)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.headers)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.headers[section]
+        return super().headerData(section, orientation, role)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        task = self.task_at(index.row())
+        column = index.column()
+        if role == TASK_ROLE:
+            return task
+        if role == Qt.ItemDataRole.UserRole:
+            return task.id
+        if role == Qt.ItemDataRole.ForegroundRole and column < 3:
+            return self._foreground(column, task)
+        if column == 0:
+            # 按列宽省略由 TextDelegate 绘制时完成
+            if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole, Qt.ItemDataRole.ToolTipRole):
+                return task.text
+        elif column == 1:
+            if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+                return task.priority.label
+        elif column == 2:
+            if role == Qt.ItemDataRole.DisplayRole:
+                deadline = task.deadline_date()
+                return deadline.strftime('%m-%d') if deadline else ''
+        elif column == 3:
+            if role == Qt.ItemDataRole.ToolTipRole and self.task_manager.is_archived(task):
+                return '已归档，取消勾选可恢复'
+        return None
+
+    def _foreground(self, column, task):
+        if task.completed:
+            color = theme.color('completed')
+        elif column == 1:
+            color = theme.priority_color(task.priority)
+        elif column == 2 and task.deadline_ordinal < self.today:
+            color = theme.color('overdue')
+        else:
+            color = theme.color('text')
+        fade = self.fading.get(task.uid)
+        if fade is not None:
+            color = QColor(color)
+            color.setAlpha(int(255 * (1 - fade)))
+        return color
+
+    def is_overdue(self, task):
+        return not task.completed and task.deadline_ordinal < self.today
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled
+        task = self.task_at(index.row())
+        # 归档任务只读（仍可删除、取消完成）；已完成任务不能修改优先级
+        if not self.task_manager.is_archived(task):
+            if index.column() == 0 or (index.column() == 1 and not task.completed):
+                flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        task = self.task_at(index.row())
+        if index.column() == 0:
+            value = value.strip()
+            if not value:
+                return False
+            fields = {'text': value}
+        elif index.column() == 1:
+            fields = {'priority': value}
+        else:
+            return False
+        if not self.task_manager.update(task.id, **fields):
+            return False
+        self.task_changed.emit(task.id)
+        return True
+
+
+class ScrollTaskTableModel(TaskTableModel):
+    """连续滚动模式的数据模型
+
+    行数为全部任务数，但只缓存视口附近的一段任务（window_size 行）：
+    视图请求缓存以外的行时，从 TaskManager 按显示顺序取回以该行为起点、
+    向前预留 overscan 行的一段。滚动开销只与可见行数有关，与任务总数无关。
+    """
+
+    def __init__(self, task_manager, window_size=120, overscan=20, parent=None):
+        super().__init__(task_manager, parent)
+        self.window_size = window_size
+        self.overscan = overscan
+        self.total = 0
+        self.window_offset = 0  # self.tasks 中第一条任务的行号
+
+    def is_virtual(self):
+        return True
+
+    def reload(self):
+        """重新读取总数并清空缓存（排序、加载完成时使用）"""
+        self.beginResetModel()
+        self.total = self.task_manager.count()
+        self.tasks = []
+        self.window_offset = 0
+        self.fading = {}
+        self.today = date.today().toordinal()
+        self.endResetModel()
+
+    def refresh(self):
+        """任务增删改之后刷新：调整行数并丢弃缓存段"""
+        total = self.task_manager.count()
+        if total > self.total:
+            self.beginInsertRows(QModelIndex(), self.total, total - 1)
+            self.total = total
+            self.endInsertRows()
+        elif total < self.total:
+            self.beginRemoveRows(QModelIndex(), total, self.total - 1)
+            self.total = total
+            self.endRemoveRows()
+        # 顺序可能整体变化，丢弃缓存段，重绘时按需重新读取（视图只会重绘可见的行）
+        self.tasks = []
+        if self.total:
+            self.dataChanged.emit(self.index(0, 0), self.index(self.total - 1, self.columnCount() - 1))
+
+    def _fetch(self, offset):
+        self.window_offset = offset
+        self.tasks = self.task_manager.get_display_page(offset, self.window_size)
+
+    def task_at(self, row):
+        if not 0 <= row < self.total:
+            return None
+        if not self.window_offset <= row < self.window_offset + len(self.tasks):
+            self._fetch(max(0, row - self.overscan))
+        i = row - self.window_offset
+        return self.tasks[i] if i < len(self.tasks) else None
+
+    def row_of_uid(self, uid):
+        row = super().row_of_uid(uid)
+        return None if row is None else self.window_offset + row
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.total
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if index.isValid() and self.task_at(index.row()) is None:
+            return None
+        return super().data(index, role)
+
+    def flags(self, index):
+        if index.isValid() and self.task_at(index.row()) is None:
+            return Qt.ItemFlag.NoItemFlags
+        return super().flags(index)
+
+
+class TaskTableView(QTableView):
+    """任务表格视图：设置 paint_observer 后统计每次重绘的耗时（毫秒）和绘制的行数"""
+
+    paint_observer = None
+
+    def paintEvent(self, event):
+        if self.paint_observer is None:
+            super().paintEvent(event)
+            return
+        start = time.perf_counter()
+        super().paintEvent(event)
+        ms = (time.perf_counter() - start) * 1000
+        rect = event.rect()
+        first = self.rowAt(rect.top())
+        last = self.rowAt(rect.bottom())
+        if last < 0:
+            last = self.model().rowCount() - 1
+        self.paint_observer(ms, last - first + 1 if first >= 0 else 0)
+
+
+class TaskItemDelegate(QStyledItemDelegate):
+    """基础委托：已完成任务显示删除线
+
+    编辑器用完后只隐藏不销毁，下次编辑时重新绑定到新的单元格，信号只连接一次。
+    同一时刻只复用一个编辑器；上一个还在使用中时（例如切换编辑的单元格）临时新建。
+    """
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.editor = None  # 复用的编辑器
+
+    def createEditor(self, parent, option, index):
+        editor = self.editor
+        if editor is None or editor.parent() is not parent:
+            editor = self.editor = self.new_editor(parent, option, index)
+        elif editor.isVisible():
+            return self.new_editor(parent, option, index)
+        return editor
+
+    def new_editor(self, parent, option, index):
+        return super().createEditor(parent, option, index)
+
+    def destroyEditor(self, editor, index):
+        # 视图关闭编辑器时已经将其隐藏，复用的编辑器保留在原处
+        if editor is not self.editor:
+            super().destroyEditor(editor, index)
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        task = index.data(TASK_ROLE)
+        if task is not None and task.completed:
+            option.font.setStrikeOut(True)
+
+
+class TextDelegate(TaskItemDelegate):
+    """任务文本列：按列宽（像素）省略过长的文本，任务有标签时在右侧显示 #标签
+
+    省略结果按 (文本, 字体, 宽度档) 缓存，宽度按 WIDTH_STEP 像素分档，
+    只有第一列宽度跨档或字体档位变化时才重新计算；每个字体的 QFontMetrics 也只创建一次。
+    标签最多占列宽的 1/3，文本按剩余宽度省略。
+    """
+
+    WIDTH_STEP = 8
+    CACHE_LIMIT = 4096
+    TAG_GAP = 6
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.elided = {}   # (text, font_key, width) -> 省略后的文本
+        self.metrics = {}  # font_key -> QFontMetrics
+        self.widths = {}   # (text, font_key) -> 像素宽度
+        self.margin = None
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        if self.margin is None:
+            # 与 QCommonStyle 绘制单元格文本时左右各留的边距一致
+            view = self.parent()
+            self.margin = 2 * (view.style().pixelMetric(QStyle.PixelMetric.PM_FocusFrameHMargin, None, view) + 1)
+        width = option.rect.width() - self.margin
+        task = index.data(TASK_ROLE)
+        if task is not None and task.tags:
+            _, tag_width = self.tag_label(task, option.font, option.rect.width())
+            width -= tag_width + self.TAG_GAP
+        option.text = self.elide(option.text, option.font, width - width % self.WIDTH_STEP)
+        option.textElideMode = Qt.TextElideMode.ElideNone
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        task = index.data(TASK_ROLE)
+        if task is None or not task.tags:
+            return
+        label, tag_width = self.tag_label(task, option.font, option.rect.width())
+        rect = option.rect.adjusted(option.rect.width() - tag_width - self.margin // 2, 0, -(self.margin // 2), 0)
+        painter.save()
+        painter.setFont(option.font)
+        painter.setPen(theme.color('completed' if task.completed else 'tag'))
+        painter.drawText(rect, Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter, label)
+        painter.restore()
+
+    def tag_label(self, task, font, width):
+        """任务标签的显示文本（#a #b，超出列宽 1/3 时省略）和像素宽度"""
+        limit = width // 3
+        label = self.elide(' '.join('#' + tag for tag in task.tags), font, limit - limit % self.WIDTH_STEP)
+        key = (label, font.key())
+        label_width = self.widths.get(key)
+        if label_width is None:
+            if len(self.widths) >= self.CACHE_LIMIT:
+                self.widths.clear()
+            label_width = self.widths[key] = self.font_metrics(font).horizontalAdvance(label)
+        return label, label_width
+
+    def font_metrics(self, font):
+        font_key = font.key()
+        metrics = self.metrics.get(font_key)
+        if metrics is None:
+            metrics = self.metrics[font_key] = QFontMetrics(font)
+        return metrics
+
+    def elide(self, text, font, width):
+        if not text:
+            return text
+        font_key = font.key()
+        key = (text, font_key, width)
+        result = self.elided.get(key)
+        if result is None:
+            metrics = self.font_metrics(font)
+            # 超长文本先截到列宽可能容纳的字符数，避免对整段文本做排版
+            limit = max(width, 0) // 2 + 2
+            source = text if len(text) <= limit else text[:limit] + '…'
+            result = metrics.elidedText(source, Qt.TextElideMode.ElideRight, max(width, 0))
+            if len(self.elided) >= self.CACHE_LIMIT:
+                self.elided.clear()
+            self.elided[key] = result
+        return result
+
+
+class PriorityDelegate(TaskItemDelegate):
+    """优先级列：绘制带颜色的文本和下拉箭头，单击时才创建下拉框"""
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        option.rect = option.rect.adjusted(4, 0, -20, 0)
+
+    def paint(self, painter, option, index):
+        super().paint(painter, option, index)
+        arrow = QStyleOptionViewItem(option)
+        arrow.rect = QRect(option.rect.right() - 14, option.rect.center().y() - 4, 8, 8)
+        style = self.parent().style() if self.parent() else None
+        if style:
+            style.drawPrimitive(QStyle.PrimitiveElement.PE_IndicatorArrowDown, arrow, painter, self.parent())
+
+    def editorEvent(self, event, model, option, index):
+        if (event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton
+                and index.flags() & Qt.ItemFlag.ItemIsEditable):
+            self.parent().edit(index)
+            return True
+        return super().editorEvent(event, model, option, index)
+
+    def new_editor(self, parent, option, index):
+        combo = QComboBox(parent)
+        combo.setObjectName('priorityEditor')
+        combo.addItems(PRIORITY_ITEMS)
+        combo.currentTextChanged.connect(
+            lambda text: theme.set_state(combo, priority=Priority.from_label(text).name))
+        combo.wheelEvent = lambda event: event.ignore()
+        combo.activated.connect(lambda _: self._commit_and_close(combo))
+        return combo
+
+    def _commit_and_close(self, combo):
+        self.commitData.emit(combo)
+        self.closeEditor.emit(combo, QAbstractItemDelegate.EndEditHint.NoHint)
+
+    def setEditorData(self, editor, index):
+        editor.setCurrentText(index.data(Qt.ItemDataRole.EditRole))
+        theme.set_state(editor, priority=index.data(TASK_ROLE).priority.name)
+        QTimer.singleShot(0, editor.showPopup)
+
+    def setModelData(self, editor, model, index):
+        model.setData(index, editor.currentText(), Qt.ItemDataRole.EditRole)
+
+    def updateEditorGeometry(self, editor, option, index):
+        editor.setGeometry(option.rect)
+
+
+class DateDelegate(TaskItemDelegate):
+    """日期列：过期任务加粗，单击时请求弹出日历"""
+
+    date_clicked = pyqtSignal(str, QPoint)  # task_id, 日历弹出位置（全局坐标）
+
+    def initStyleOption(self, option, index):
+        super().initStyleOption(option, index)
+        task = index.data(TASK_ROLE)
+        if task is not None and index.model().is_overdue(task):
+            option.font.setBold(True)
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() == QEvent.Type.MouseButtonRelease and event.button() == Qt.MouseButton.LeftButton:
+            task = index.data(TASK_ROLE)
+            if task is not None and not task.completed and not model.task_manager.is_archived(task):
+                pos = self.parent().viewport().mapToGlobal(option.rect.bottomLeft())
+                self.date_clicked.emit(task.id, pos)
+                return True
+        return super().editorEvent(event, model, option, index)
+
+
+class OperationDelegate(QStyledItemDelegate):
+    """操作列：绘制完成勾选框和删除按钮，点击时发出信号"""
+
+    toggled = pyqtSignal(str, bool)       # task_id, 新的完成状态
+    delete_requested = pyqtSignal(str)    # task_id
+
+    CHECK_SIZE = 14
+    DELETE_SIZE = 16
+    SPACING = 5
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        # 悬停在按钮之间移动时单元格本身不会重绘，需要自己刷新
+        view.viewport().installEventFilter(self)
+        self.hover_row = None
+
+    def _rects(self, rect):
+        total = self.CHECK_SIZE + self.SPACING + self.DELETE_SIZE
+        left = rect.center().x() - total // 2
+        center_y = rect.center().y()
+        check = QRect(left, center_y - self.CHECK_SIZE // 2, self.CHECK_SIZE, self.CHECK_SIZE)
+        delete = QRect(left + self.CHECK_SIZE + self.SPACING, center_y - self.DELETE_SIZE // 2,
+                       self.DELETE_SIZE, self.DELETE_SIZE)
+        return check, delete
+
+    def paint(self, painter, option, index):
+        task = index.data(TASK_ROLE)
+        if task is None:
+            return
+        check, delete = self._rects(option.rect)
+        cursor = None
+        if option.state & QStyle.StateFlag.State_MouseOver:
+            cursor = self.view.viewport().mapFromGlobal(QCursor.pos())
+
+        painter.save()
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        check_hover = cursor is not None and check.contains(cursor)
+        border = theme.color('check_hover') if check_hover else theme.color('check')
+        box = QRectF(check).adjusted(1, 1, -1, -1)
+        painter.setPen(QPen(border, 2))
+        if task.completed:
+            painter.setBrush(border)
+        elif check_hover:
+            tint = QColor(theme.color('check'))
+            tint.setAlpha(25)
+            painter.setBrush(tint)
+        else:
+            painter.setBrush(QColor('white'))
+        painter.drawRoundedRect(box, 2, 2)
+        if task.completed:
+            path = QPainterPath(QPointF(box.left() + 2.5, box.center().y()))
+            path.lineTo(QPointF(box.center().x() - 0.5, box.bottom() - 3))
+            path.lineTo(QPointF(box.right() - 2.5, box.top() + 3))
+            painter.setPen(QPen(QColor('white'), 1.6))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawPath(path)
+
+        font = painter.font()
+        font.setPixelSize(14)
+        font.setBold(True)
+        painter.setFont(font)
+        delete_hover = cursor is not None and delete.contains(cursor)
+        painter.setPen(theme.color('delete_hover') if delete_hover else theme.color('delete'))
+        painter.drawText(delete, Qt.AlignmentFlag.AlignCenter, '×')
+        painter.restore()
+
+    def editorEvent(self, event, model, option, index):
+        if event.type() not in (QEvent.Type.MouseButtonPress, QEvent.Type.MouseButtonRelease,
+                                QEvent.Type.MouseButtonDblClick):
+            return super().editorEvent(event, model, option, index)
+        task = index.data(TASK_ROLE)
+        if task is None or event.button() != Qt.MouseButton.LeftButton:
+            return False
+        check, delete = self._rects(option.rect)
+        pos = event.position().toPoint()
+        if check.contains(pos):
+            if event.type() == QEvent.Type.MouseButtonRelease:
+                # 归档任务同样可以取消完成，取消后移回主数据
+                self.toggled.emit(task.id, not task.completed)
+            return True
+        if delete.contains(pos):
+            if event.type() == QEvent.Type.MouseButtonRelease:
+                self.delete_requested.emit(task.id)
+            return True
+        return False
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.MouseMove:
+            index = self.view.indexAt(event.position().toPoint())
+            row = index.row() if index.isValid() and index.column() == 3 else None
+            self._update_row(self.hover_row)
+            self._update_row(row)
+            self.hover_row = row
+        elif event.type() == QEvent.Type.Leave:
+            self._update_row(self.hover_row)
+            self.hover_row = None
+        return False
+
+    def _update_row(self, row):
+        if row is not None:
+            self.view.viewport().update(self.view.visualRect(self.view.model().index(row, 3)))
@@ -0,0 +1,86 @@
+from PyQt6.QtWidgets import QApplication
+from PyQt6.QtGui import QColor
+
+from core.task import Priority
+from .styles import APP_STYLE, PALETTE, FONT_TIERS
+
+# 优先级对应的配色，未列出的优先级使用普通文本色
+PRIORITY_COLOR_KEYS = {
+    Priority.URGENT_IMPORTANT: 'urgent_important',
+    Priority.IMPORTANT_NOT_URGENT: 'important_not_urgent',
+}
+
+# 标题栏计数徽标的底色：四个象限、过期、今日完成
+BADGE_COLOR_KEYS = {
+    Priority.URGENT_IMPORTANT.name: 'urgent_important',
+    Priority.IMPORTANT_NOT_URGENT.name: 'important_not_urgent',
+    Priority.URGENT_NOT_IMPORTANT.name: 'urgent_not_important',
+    Priority.NOT_URGENT_NOT_IMPORTANT.name: 'badge',
+    'overdue': 'overdue',
+    'done': 'check',
+}
+
+_stylesheet = None
+_colors = {}
+
+
+def stylesheet():
+    """生成应用级样式表（只编译一次）"""
+    global _stylesheet
+    if _stylesheet is None:
+        rules = [APP_STYLE]
+        for tier, size in FONT_TIERS.items():
+            rules.append(f'QTableView#taskTable[fontTier="{tier}"], QHeaderView#taskHeader[fontTier="{tier}"] '
+                         f'{{ font-size: {size}px; }}')
+        for priority in Priority:
+            rules.append(f'QComboBox#priorityEditor[priority="{priority.name}"] '
+                         f'{{ color: {PALETTE[PRIORITY_COLOR_KEYS.get(priority, "text")]}; }}')
+        rules.append(f'QLabel#pageLabel {{ color: {PALETTE["page_text"]}; }}')
+        rules.append(f'QLabel#pageLabel[loading="true"] {{ color: {PALETTE["page_loading"]}; }}')
+        rules.append(f'QLineEdit#searchInput[invalid="true"] {{ border-color: {PALETTE["invalid"]}; }}')
+        for badge, key in BADGE_COLOR_KEYS.items():
+            rules.append(f'QLabel#countBadge[badge="{badge}"] {{ background-color: {PALETTE[key]}; }}')
+        _stylesheet = '\n'.join(rules)
+    return _stylesheet
+
+
+def install(app=None):
+    """把样式表设置到 QApplication 上，重复调用不会重新解析"""
+    app = app or QApplication.instance()
+    if app is not None and app.styleSheet() != stylesheet():
+        app.setStyleSheet(stylesheet())
+
+
+def set_state(widget, **properties):
+    """切换控件的动态属性并重新应用样式，属性值都没有变化时直接返回 False"""
+    changed = False
+    for name, value in properties.items():
+        if widget.property(name) != value:
+            widget.setProperty(name, value)
+            changed = True
+    if changed:
+        style = widget.style()
+        style.unpolish(widget)
+        style.polish(widget)
+    return changed
+
+
+def color(name):
+    """按名称取配色（缓存的 QColor，需要修改时请复制）"""
+    c = _colors.get(name)
+    if c is None:
+        c = _colors[name] = QColor(PALETTE[name])
+    return c
+
+
+def priority_color(priority):
+    return color(PRIORITY_COLOR_KEYS.get(priority, 'text'))
+
+
+def font_tier(width, height):
+    """按窗口大小选择表格字体档位"""
+    if width <= 480 or height <= 360:
+        return 'small'
+    if width <= 640 or height <= 540:
+        return 'medium'
+    return 'large'